@@ -3,8 +3,29 @@ Recall API Configuration Template
 Copy this file and update with your actual API credentials
 """
 
+import sys
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+
+_intern = sys.intern
+
+def _freeze(raw: dict) -> MappingProxyType:
+    """Intern string values and wrap the config in a read-only view"""
+    return MappingProxyType({
+        key: _intern(value) if isinstance(value, str) else value
+        for key, value in raw.items()
+    })
+
+# (getter, field, template placeholder) for each required field
+_REQUIRED = tuple(
+    (itemgetter(f), f, _intern(f'your_{f}_here'))
+    for f in ('api_key', 'competition_id', 'user_id')
+)
+
 # Recall API Configuration
-RECALL_API_CONFIG = {
+RECALL_API_CONFIG = _freeze({
     # API Settings
     'api_base_url': 'https://api.recall.ai/v1',  # Update if different
     'api_key': 'your_api_key_here',  # Replace with your actual API key
@@ -20,10 +41,10 @@ RECALL_API_CONFIG = {
     'enable_logging': True,  # Enable/disable logging
     'auto_sync': False,  # Enable automatic portfolio synchronization
     'sync_interval': 60,  # Sync interval in seconds (if auto_sync is True)
-}
+})
 
 # Example configuration for development/testing
-RECALL_API_CONFIG_DEV = {
+RECALL_API_CONFIG_DEV = _freeze({
     'api_base_url': 'https://api.recall.ai/v1',
     'api_key': 'dev_api_key_here',
     'competition_id': 'dev_competition_id',
@@ -34,10 +55,10 @@ RECALL_API_CONFIG_DEV = {
     'enable_logging': True,
     'auto_sync': False,
     'sync_interval': 60,
-}
+})
 
 # Example configuration for production
-RECALL_API_CONFIG_PROD = {
+RECALL_API_CONFIG_PROD = _freeze({
     'api_base_url': 'https://api.recall.ai/v1',
     'api_key': 'prod_api_key_here',
     'competition_id': 'prod_competition_id',
@@ -48,40 +69,127 @@ RECALL_API_CONFIG_PROD = {
     'enable_logging': True,
     'auto_sync': True,
     'sync_interval': 30,
-}
+})
+
+# Environment name -> configuration, built once at import time
+_CONFIGS = MappingProxyType({
+    'default': RECALL_API_CONFIG,
+    'dev': RECALL_API_CONFIG_DEV,
+    'prod': RECALL_API_CONFIG_PROD
+})
+
+# Frozen configs live for the whole process, so their ids are stable and
+# can be remembered once they pass validation
+_FROZEN_IDS = frozenset(id(config) for config in _CONFIGS.values())
+_validated: set = set()
 
-def get_config(environment: str = 'default') -> dict:
+@dataclass(frozen=True)
+class RecallConfig:
+    """Typed, read-only Recall API configuration with attribute access"""
+    __slots__ = (
+        'api_base_url', 'api_key', 'competition_id', 'user_id',
+        'timeout', 'retry_attempts', 'retry_delay',
+        'enable_logging', 'auto_sync', 'sync_interval'
+    )
+    
+    api_base_url: str
+    api_key: str
+    competition_id: str
+    user_id: str
+    timeout: int
+    retry_attempts: int
+    retry_delay: int
+    enable_logging: bool
+    auto_sync: bool
+    sync_interval: int
+    
+    def as_dict(self) -> dict:
+        """Return the configuration as a plain dictionary"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+@lru_cache(maxsize=8)
+def get_config(environment: str = 'default') -> MappingProxyType:
     """
     Get configuration for specified environment
     
+    The returned mapping is read-only and shared between callers; copy
+    it with dict(config) if you need to modify settings.
+    
     Args:
         environment: 'default', 'dev', or 'prod'
     
     Returns:
-        Configuration dictionary
+        Read-only configuration mapping
+    """
+    return _CONFIGS.get(environment, RECALL_API_CONFIG)
+
+@lru_cache(maxsize=8)
+def get_recall_config(environment: str = 'default') -> RecallConfig:
     """
-    configs = {
-        'default': RECALL_API_CONFIG,
-        'dev': RECALL_API_CONFIG_DEV,
-        'prod': RECALL_API_CONFIG_PROD
-    }
+    Get configuration for specified environment as a RecallConfig
     
-    return configs.get(environment, RECALL_API_CONFIG)
+    Args:
+        environment: 'default', 'dev', or 'prod'
+    
+    Returns:
+        RecallConfig instance, built once per environment
+    """
+    return RecallConfig(**get_config(environment))
 
 def validate_config(config: dict) -> tuple[bool, str]:
     """
     Validate configuration settings
     
+    Results are cached on the configuration contents, so repeated
+    validation of the same settings is a single dictionary lookup.
+    
     Args:
-        config: Configuration dictionary to validate
+        config: Configuration dictionary (or RecallConfig) to validate
     
     Returns:
         Tuple of (is_valid, error_message)
     """
-    required_fields = ['api_key', 'competition_id', 'user_id']
+    if isinstance(config, RecallConfig):
+        # Frozen, so the instance itself is a safe cache key
+        try:
+            return _validate_recall_config(config)
+        except TypeError:
+            config = config.as_dict()  # Unhashable field values
     
-    for field in required_fields:
-        if not config.get(field) or config[field] == f'your_{field}_here':
+    config_id = id(config)
+    if config_id in _validated:
+        return True, "Configuration is valid"
+    
+    try:
+        key = tuple(sorted(config.items()))
+        hash(key)
+    except TypeError:
+        # Unhashable values (e.g. nested dicts) - validate without caching
+        return _validate(config)
+    
+    result = _validate_cached(key)
+    if result[0] and config_id in _FROZEN_IDS:
+        _validated.add(config_id)
+    return result
+
+@lru_cache(maxsize=32)
+def _validate_recall_config(config: RecallConfig) -> tuple[bool, str]:
+    """Validate a RecallConfig, once per distinct instance value"""
+    return _validate(config.as_dict())
+
+@lru_cache(maxsize=32)
+def _validate_cached(items: tuple) -> tuple[bool, str]:
+    """Validate a configuration given as a sorted tuple of items"""
+    return _validate(dict(items))
+
+def _validate(config: dict) -> tuple[bool, str]:
+    """Run the configuration checks"""
+    for getter, field, placeholder in _REQUIRED:
+        try:
+            value = getter(config)
+        except KeyError:
+            return False, f"Missing or invalid {field}"
+        if not value or value is placeholder or value == placeholder:
             return False, f"Missing or invalid {field}"
     
     if config.get('timeout', 0) <= 0:
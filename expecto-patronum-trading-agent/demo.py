@@ -5,32 +5,46 @@ Demonstrates the key features of the magical trading agent
 """
 
 import sys
-import os
-import time
-from datetime import datetime
+import logging
+import functools
+from types import SimpleNamespace
 
-# Add the src directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+__all__ = ['main']
 
-def demo_trading_spells():
+@functools.lru_cache(maxsize=None)
+def _core():
+    """Import the core components once and share them between demos"""
+    from src.core.trading_engine import TradingEngine
+    from src.core.portfolio import Portfolio
+    from src.core.risk_manager import RiskManager
+    from src.core.market_data_provider import MarketDataProvider
+    from src.database.database_manager import DatabaseManager
+    
+    return SimpleNamespace(
+        TradingEngine=TradingEngine,
+        Portfolio=Portfolio,
+        RiskManager=RiskManager,
+        MarketDataProvider=MarketDataProvider,
+        DatabaseManager=DatabaseManager
+    )
+
+def demo_trading_spells(market_data=None):
     """Demonstrate the trading spells"""
     print("🪄 Trading Spells Demonstration")
     print("=" * 50)
     
     try:
-        from src.core.trading_engine import TradingEngine
-        from src.core.portfolio import Portfolio
-        from src.core.risk_manager import RiskManager
-        from src.core.market_data_provider import MarketDataProvider
-        from src.database.database_manager import DatabaseManager
+        c = _core()
         
         # Initialize components
         print("🔧 Initializing magical components...")
-        db_manager = DatabaseManager("demo.db")
-        market_data = MarketDataProvider()
-        portfolio = Portfolio(db_manager)
-        risk_manager = RiskManager()
-        trading_engine = TradingEngine(market_data, portfolio, risk_manager, db_manager)
+        db_manager = c.DatabaseManager(":memory:")
+        owns_market_data = market_data is None
+        if owns_market_data:
+            market_data = c.MarketDataProvider()
+        portfolio = c.Portfolio(db_manager)
+        risk_manager = c.RiskManager()
+        trading_engine = c.TradingEngine(market_data, portfolio, risk_manager, db_manager)
         
         # Activate trading engine
         print("✨ Casting LUMOS to activate trading engine...")
@@ -39,7 +53,8 @@ def demo_trading_spells():
         
         # Wait for market data
         print("📡 Waiting for market data...")
-        time.sleep(5)
+        if not trading_engine.wait_ready(5):
+            print("   ⚠️ Market data not ready yet, continuing anyway")
         
         # Demo trading spells
         print("\n🦌 Casting EXPECTO LONG spell...")
@@ -68,9 +83,9 @@ def demo_trading_spells():
         print(f"   Result: {result['message']}")
         
         # Cleanup
-        market_data.stop()
+        if owns_market_data:
+            market_data.stop()
         db_manager.close()
-        os.remove("demo.db")
         
         print("\n✅ Demo completed successfully!")
         
@@ -83,9 +98,9 @@ def demo_risk_management():
     print("=" * 50)
     
     try:
-        from src.core.risk_manager import RiskManager
+        c = _core()
         
-        risk_manager = RiskManager()
+        risk_manager = c.RiskManager()
         
         # Test position limits
         print("🔍 Testing position limits...")
@@ -113,19 +128,19 @@ def demo_risk_management():
     except Exception as e:
         print(f"❌ Risk management demo failed: {e}")
 
-def demo_market_data():
+def demo_market_data(market_data=None):
     """Demonstrate market data features"""
     print("\n📡 Market Data Demonstration")
     print("=" * 50)
     
     try:
-        from src.core.market_data_provider import MarketDataProvider
+        owns_market_data = market_data is None
+        if owns_market_data:
+            market_data = _core().MarketDataProvider()
         
-        market_data = MarketDataProvider()
-        
-        # Wait for data
+        # Wait for data (returns as soon as the first update lands)
         print("⏳ Waiting for market data...")
-        time.sleep(3)
+        market_data.ready_event.wait(timeout=3)
         
         # Get prices
         print("\n💰 Current Prices:")
@@ -143,7 +158,8 @@ def demo_market_data():
         print(f"   Total market cap: ${summary['total_market_cap']:,.0f}")
         
         # Stop
-        market_data.stop()
+        if owns_market_data:
+            market_data.stop()
         
         print("\n✅ Market data demo completed!")
         
@@ -152,16 +168,31 @@ def demo_market_data():
 
 def main():
     """Run all demonstrations"""
+    logging.basicConfig(level=logging.INFO)
+    
+    # Buffer output and flush once per demo section instead of per line
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
     print("🦌 Expecto Patronum Trading Agent - Feature Demonstration")
     print("=" * 60)
     print("This demo showcases the magical features of the trading agent")
     print("No real money is involved - all trades are simulated!")
     print("=" * 60)
     
+    # One market data provider is shared by all demos
+    market_data = _core().MarketDataProvider()
+    
     # Run demonstrations
-    demo_trading_spells()
-    demo_risk_management()
-    demo_market_data()
+    try:
+        demo_trading_spells(market_data)
+        sys.stdout.flush()
+        demo_risk_management()
+        sys.stdout.flush()
+        demo_market_data(market_data)
+        sys.stdout.flush()
+    finally:
+        market_data.stop()
     
     print("\n" + "=" * 60)
     print("🎉 All demonstrations completed!")
@@ -169,6 +200,7 @@ def main():
     print("   python main.py")
     print("\n📚 For more information, see README.md")
     print("=" * 60)
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
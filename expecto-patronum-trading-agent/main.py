@@ -6,13 +6,8 @@ A Harry Potter-themed cryptocurrency trading simulator
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
-import time
 import sys
-import os
-
-# Add the src directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+import logging
 
 from src.gui.main_window import MainWindow
 from src.core.trading_engine import TradingEngine
@@ -22,6 +17,27 @@ from src.core.market_data_provider import MarketDataProvider
 from src.core.recall_api_connector import RecallAPIConnector
 from src.database.database_manager import DatabaseManager
 
+# Harry Potter color scheme for ttk widgets
+THEME = {
+    'Magical.TFrame': {'background': '#1a1a2e'},
+    'Magical.TLabel': {
+        'background': '#1a1a2e',
+        'foreground': '#e94560',
+        'font': ('Arial', 10, 'bold')
+    },
+    'Magical.TButton': {
+        'background': '#16213e',
+        'foreground': '#e94560',
+        'font': ('Arial', 10, 'bold')
+    }
+}
+
+# Milliseconds between WAL checkpoints while the app runs
+CHECKPOINT_INTERVAL_MS = 60 * 60 * 1000
+
+# Milliseconds between checks for buffered database rows that are due
+FLUSH_INTERVAL_MS = 1000
+
 class ExpectoPatronumApp:
     """Main application class for the Expecto Patronum trading agent"""
     
@@ -62,13 +78,25 @@ class ExpectoPatronumApp:
             self.market_data
         )
         
-        # Start background tasks
-        self.start_background_tasks()
+        # MarketDataProvider polls prices on its own background thread, and
+        # GUI refreshes run on the Tk event loop (MainWindow.update_displays
+        # reschedules itself via root.after), so no extra threads are needed.
+        self.root.after(CHECKPOINT_INTERVAL_MS, self.checkpoint_database)
+        self.root.after(FLUSH_INTERVAL_MS, self.flush_database)
+    
+    def flush_database(self):
+        """Write buffered price points and snapshots once they are due"""
+        self.db_manager.flush_stale_buffers()
+        self.root.after(FLUSH_INTERVAL_MS, self.flush_database)
+    
+    def checkpoint_database(self):
+        """Keep the database WAL file small during long sessions"""
+        self.db_manager.checkpoint()
+        self.root.after(CHECKPOINT_INTERVAL_MS, self.checkpoint_database)
     
     def setup_main_window(self):
         """Setup the main application window with Harry Potter theme"""
         self.root.title("Expecto Patronum - Magical Trading Agent")
-        self.root.geometry("1200x800")
         self.root.configure(bg='#1a1a2e')  # Dark magical blue
         
         # Set window icon (if available)
@@ -82,48 +110,16 @@ class ExpectoPatronumApp:
         style.theme_use('clam')
         
         # Harry Potter color scheme
-        style.configure('Magical.TFrame', background='#1a1a2e')
-        style.configure('Magical.TLabel', 
-                       background='#1a1a2e', 
-                       foreground='#e94560',
-                       font=('Arial', 10, 'bold'))
-        style.configure('Magical.TButton',
-                       background='#16213e',
-                       foreground='#e94560',
-                       font=('Arial', 10, 'bold'))
+        for name, options in THEME.items():
+            style.configure(name, **options)
         
         # Center window on screen
-        self.root.update_idletasks()
         x = (self.root.winfo_screenwidth() // 2) - (1200 // 2)
         y = (self.root.winfo_screenheight() // 2) - (800 // 2)
         self.root.geometry(f"1200x800+{x}+{y}")
-    
-    def start_background_tasks(self):
-        """Start background tasks for real-time data updates"""
-        def update_market_data():
-            while True:
-                try:
-                    self.market_data.update_prices()
-                    time.sleep(30)  # Update every 30 seconds
-                except Exception as e:
-                    print(f"Error updating market data: {e}")
-                    time.sleep(60)  # Wait longer on error
-        
-        def update_gui():
-            while True:
-                try:
-                    self.main_window.update_displays()
-                    time.sleep(5)  # Update GUI every 5 seconds
-                except Exception as e:
-                    print(f"Error updating GUI: {e}")
-                    time.sleep(10)
         
-        # Start background threads
-        market_thread = threading.Thread(target=update_market_data, daemon=True)
-        gui_thread = threading.Thread(target=update_gui, daemon=True)
-        
-        market_thread.start()
-        gui_thread.start()
+        # Apply pending layout work once, after all configuration
+        self.root.update_idletasks()
     
     def run(self):
         """Start the application"""
@@ -142,16 +138,25 @@ class ExpectoPatronumApp:
     def cleanup(self):
         """Cleanup resources before exit"""
         try:
-            if hasattr(self, 'trading_engine'):
+            try:
+                self.market_data.stop()
+            except AttributeError:
+                pass  # Market data was never started
+            try:
                 self.trading_engine.stop()
-            if hasattr(self, 'db_manager'):
+            except AttributeError:
+                pass  # Engine was never created
+            try:
                 self.db_manager.close()
+            except AttributeError:
+                pass  # Database was never opened
             print("🧹 Cleanup completed")
         except Exception as e:
             print(f"Error during cleanup: {e}")
 
 def main():
     """Main entry point"""
+    logging.basicConfig(level=logging.INFO)
     try:
         app = ExpectoPatronumApp()
         app.run()
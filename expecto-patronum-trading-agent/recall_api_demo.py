@@ -5,12 +5,10 @@ Demonstrates how to integrate the Recall API connector with Expecto Patronum
 """
 
 import sys
-import os
-import time
-from datetime import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
-# Add the src directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+__all__ = ['main']
 
 def demo_recall_api_connector():
     """Demonstrate the Recall API connector functionality"""
@@ -46,22 +44,7 @@ def demo_recall_api_connector():
             print(f"❌ {connection_result['message']}")
             print("💡 This is expected if you haven't set up real API credentials yet")
         
-        # Get competition status
-        print("\n📊 Getting competition status...")
-        status_result = connector.get_competition_status()
-        
-        if status_result['success']:
-            print(f"✅ {status_result['message']}")
-            status = status_result['status']
-            if status:
-                print(f"   Competition: {status.get('name', 'Unknown')}")
-                print(f"   Status: {status.get('status', 'Unknown')}")
-                print(f"   Participants: {status.get('participant_count', 0)}")
-        else:
-            print(f"❌ {status_result['message']}")
-        
-        # Demo order submission
-        print("\n📝 Demo order submission...")
+        # Demo order and portfolio payloads
         order_data = {
             'symbol': 'bitcoin',
             'amount': 0.01,
@@ -72,17 +55,6 @@ def demo_recall_api_connector():
             'risk_score': 0.1
         }
         
-        order_result = connector.submit_order_to_competition(order_data)
-        
-        if order_result['success']:
-            print(f"✅ {order_result['message']}")
-            print(f"   Order ID: {order_result.get('order_id', 'N/A')}")
-        else:
-            print(f"❌ {order_result['message']}")
-            print("💡 This is expected if you haven't set up real API credentials yet")
-        
-        # Demo portfolio sync
-        print("\n🔄 Demo portfolio synchronization...")
         portfolio_data = {
             'total_value': 10000.0,
             'cash': 9500.0,
@@ -104,7 +76,41 @@ def demo_recall_api_connector():
             'risk_level': 'low'
         }
         
-        sync_result = connector.sync_portfolio_with_api(portfolio_data)
+        # The three calls are independent, so overlap their network round trips;
+        # each thread takes its own pooled connection from the connector's session
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            status_future = executor.submit(connector.get_competition_status)
+            order_future = executor.submit(connector.submit_order_to_competition, order_data)
+            sync_future = executor.submit(connector.sync_portfolio_with_api, portfolio_data)
+        
+        # Get competition status
+        print("\n📊 Getting competition status...")
+        status_result = status_future.result()
+        
+        if status_result['success']:
+            print(f"✅ {status_result['message']}")
+            status = status_result['status']
+            if status:
+                print(f"   Competition: {status.get('name', 'Unknown')}")
+                print(f"   Status: {status.get('status', 'Unknown')}")
+                print(f"   Participants: {status.get('participant_count', 0)}")
+        else:
+            print(f"❌ {status_result['message']}")
+        
+        # Demo order submission
+        print("\n📝 Demo order submission...")
+        order_result = order_future.result()
+        
+        if order_result['success']:
+            print(f"✅ {order_result['message']}")
+            print(f"   Order ID: {order_result.get('order_id', 'N/A')}")
+        else:
+            print(f"❌ {order_result['message']}")
+            print("💡 This is expected if you haven't set up real API credentials yet")
+        
+        # Demo portfolio sync
+        print("\n🔄 Demo portfolio synchronization...")
+        sync_result = sync_future.result()
         
         if sync_result['success']:
             print(f"✅ {sync_result['message']}")
@@ -147,7 +153,7 @@ def demo_integration_with_trading_engine():
         
         # Initialize components
         print("🔧 Initializing trading components...")
-        db_manager = DatabaseManager("demo_integration.db")
+        db_manager = DatabaseManager(":memory:")
         market_data = MarketDataProvider()
         portfolio = Portfolio(db_manager)
         risk_manager = RiskManager()
@@ -176,32 +182,32 @@ def demo_integration_with_trading_engine():
         if spell_result['success']:
             print(f"✅ {spell_result['message']}")
             
-            # Submit trade to Recall
-            print("\n📝 Submitting trade to Recall competition...")
+            # Submit trade, sync portfolio and get competition status in one request
+            print("\n📦 Submitting trade, syncing portfolio and getting competition status...")
             trade_data = {
                 'symbol': 'bitcoin',
                 'amount': 0.01,
                 'spell': 'EXPECTO_LONG'
             }
             
-            recall_result = trading_engine.submit_trade_to_recall(trade_data)
-            if recall_result['success']:
+            batch_result = trading_engine.sync_with_recall_batch(trade_data)
+            # Results follow the operation order: order, portfolio sync, status
+            results = batch_result.get('results') or [None, None, None]
+            
+            recall_result = results[0] or batch_result
+            if recall_result.get('success'):
                 print(f"✅ Trade submitted to Recall: {recall_result.get('order_id', 'N/A')}")
             else:
                 print(f"⚠️ Recall submission: {recall_result.get('message', 'Unknown error')}")
             
-            # Sync portfolio with Recall
-            print("\n🔄 Syncing portfolio with Recall...")
-            sync_result = trading_engine.sync_portfolio_with_recall()
-            if sync_result['success']:
+            sync_result = results[1] or batch_result
+            if sync_result.get('success'):
                 print(f"✅ Portfolio synced: {sync_result.get('message', 'Success')}")
             else:
                 print(f"⚠️ Portfolio sync: {sync_result.get('message', 'Unknown error')}")
             
-            # Get competition status
-            print("\n📊 Getting competition status...")
-            status_result = trading_engine.get_recall_competition_status()
-            if status_result['success']:
+            status_result = results[2] or batch_result
+            if status_result.get('success'):
                 print(f"✅ Competition status: {status_result.get('message', 'Retrieved')}")
             else:
                 print(f"⚠️ Status retrieval: {status_result.get('message', 'Unknown error')}")
@@ -211,7 +217,6 @@ def demo_integration_with_trading_engine():
         market_data.stop()
         db_manager.close()
         recall_connector.disconnect()
-        os.remove("demo_integration.db")
         
         print("\n✅ Trading engine integration demo completed!")
         
@@ -257,6 +262,12 @@ def show_configuration_guide():
 
 def main():
     """Run all Recall API demonstrations"""
+    logging.basicConfig(level=logging.INFO)
+    
+    # Buffer output and flush once per demo section instead of per line
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
     print("🔗 Recall API Integration - Feature Demonstration")
     print("=" * 60)
     print("This demo showcases the Recall API connector integration")
@@ -265,8 +276,11 @@ def main():
     
     # Run demonstrations
     demo_recall_api_connector()
+    sys.stdout.flush()
     demo_integration_with_trading_engine()
+    sys.stdout.flush()
     show_configuration_guide()
+    sys.stdout.flush()
     
     print("\n" + "=" * 60)
     print("🎉 Recall API integration demo completed!")
@@ -275,6 +289,7 @@ def main():
     print("   2. Uncomment the connector initialization in main.py")
     print("   3. Run the application: python main.py")
     print("=" * 60)
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
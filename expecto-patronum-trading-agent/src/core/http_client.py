@@ -0,0 +1,30 @@
+"""
+HTTP Client - JSON encoding helpers for the magical API calls
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to the standard library
+    orjson = None
+
+def _json_default(obj: Any) -> str:
+    """Encode values JSON has no type for - ISO 8601 for dates, str otherwise"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize a request payload to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default)
+    return json.dumps(obj, default=_json_default).encode('utf-8')
+
+def json_loads(data) -> Any:
+    """Parse a JSON document from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
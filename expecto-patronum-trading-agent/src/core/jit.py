@@ -0,0 +1,14 @@
+"""
+JIT - Optional native compilation for the numeric hot paths
+"""
+
+try:
+    from numba import njit
+except ImportError:  # Optional speedup - functions run as plain Python
+    njit = None
+
+def jit(func):
+    """Compile a pure-numeric function with numba when it is installed"""
+    if njit is None:
+        return func
+    return njit(cache=True)(func)
\ No newline at end of file
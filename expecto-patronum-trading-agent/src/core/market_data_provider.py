@@ -2,28 +2,144 @@
 Market Data Provider - Magical price fetching from CoinGecko
 """
 
-import urllib.request
+import sys
+import asyncio
 import urllib.parse
-import json
 import time
 import threading
-from typing import Dict, Optional, List
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Dict, Optional, List, Tuple
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from .http_client import json_loads
+
+try:
+    import websockets
+except ImportError:  # Optional - price streaming falls back to polling
+    websockets = None
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_HEADERS = {'User-Agent': 'ExpectoPatronum/1.0'}
+
+# Transient statuses retried with exponential backoff
+_RETRY_STATUSES = frozenset((429, 502, 503, 504))
+_MAX_RETRIES = 3
+_BACKOFF_FACTOR = 0.3
+
+# Only methods that are safe to send twice are ever retried
+_IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+# Keep-alive session shared by every provider instance
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=_MAX_RETRIES,
+        backoff_factor=_BACKOFF_FACTOR,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=_IDEMPOTENT_METHODS,
+        raise_on_status=False  # Hand back the last response once retries run out
+    )
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+# Binance public stream of 24h mini tickers for all symbols (~1 message/sec)
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443/ws/!miniTicker@arr'
+
+# Binance USDT pairs mapped to the supported coin ids
+BINANCE_SYMBOLS = {
+    'BTCUSDT': 'bitcoin',
+    'ETHUSDT': 'ethereum',
+    'ADAUSDT': 'cardano',
+    'SOLUSDT': 'solana',
+    'DOTUSDT': 'polkadot',
+    'BNBUSDT': 'binancecoin',
+    'XRPUSDT': 'ripple',
+    'DOGEUSDT': 'dogecoin'
+}
+
+# Seconds to wait before reconnecting a dropped price stream
+STREAM_RECONNECT_DELAY = 5
+
+# Price points kept per coin; older points are evicted automatically
+PRICE_HISTORY_LIMIT = 1000
+
+# Returned by _make_request when the server answered 304 Not Modified
+_NOT_MODIFIED = object()
+
+class PriceHistoryBuffer:
+    """Fixed-size ring buffer of price points stored as parallel arrays"""
+    
+    def __init__(self, capacity: int = PRICE_HISTORY_LIMIT):
+        self.capacity = capacity
+        self.prices = array('d', bytes(8 * capacity))
+        self.timestamps = array('q', bytes(8 * capacity))  # unix microseconds
+        self.head = 0  # next slot to write
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, timestamp: int, price: float):
+        """Record a price point, overwriting the oldest one when full"""
+        with self._lock:
+            self.timestamps[self.head] = timestamp
+            self.prices[self.head] = price
+            self.head = (self.head + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+    
+    def latest(self) -> Optional[int]:
+        """Return the timestamp of the newest point, or None while empty"""
+        with self._lock:
+            if not self.count:
+                return None
+            return self.timestamps[self.head - 1]
+    
+    def since(self, cutoff: int) -> Tuple[array, array]:
+        """Return (timestamps, prices) in chronological order from cutoff onwards"""
+        with self._lock:
+            if self.count < self.capacity:
+                timestamps = self.timestamps[:self.count]
+                prices = self.prices[:self.count]
+            else:
+                timestamps = self.timestamps[self.head:] + self.timestamps[:self.head]
+                prices = self.prices[self.head:] + self.prices[:self.head]
+        
+        start = bisect_left(timestamps, cutoff)
+        return timestamps[start:], prices[start:]
 
 class MarketDataProvider:
     """Magical market data provider that fetches real-time crypto prices"""
     
-    def __init__(self):
+    def __init__(self, enable_stream: bool = False):
         self.base_url = "https://api.coingecko.com/api/v3"
+        # prices and last_update are published copy-on-write: writers build a
+        # new dict and swap it in under _lock, readers use the current one
+        # without locking and must never mutate it
         self.prices = {}  # symbol -> price data
-        self.price_history = {}  # symbol -> list of price points
+        self.price_history = {}  # coin id -> PriceHistoryBuffer
         self.last_update = {}
+        self._market_stats = self._rank_market({})  # rankings for the current prices
+        self._lock = threading.RLock()
+        self._etag = {}  # url -> ETag of the last response
+        self._last_mod = {}  # url -> Last-Modified of the last response
         self.update_interval = 30  # seconds
         self.session = None
         
-        # Supported cryptocurrencies
-        self.supported_coins = {
+        # Supported cryptocurrencies (keys and ids interned for fast lookups)
+        supported_coins = {
             'bitcoin': 'bitcoin',
             'btc': 'bitcoin',
             'ethereum': 'ethereum', 
@@ -41,159 +157,311 @@ class MarketDataProvider:
             'dogecoin': 'dogecoin',
             'doge': 'dogecoin'
         }
+        self.supported_coins = {
+            sys.intern(alias): sys.intern(coin_id)
+            for alias, coin_id in supported_coins.items()
+        }
         
         # Initialize price history storage
         for coin_id in set(self.supported_coins.values()):
-            self.price_history[coin_id] = []
+            self.price_history[coin_id] = PriceHistoryBuffer()
+        self._coin_ids_csv = self._format_coin_ids()
         
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        # Set once the first price update has completed
+        self.ready_event = threading.Event()
         
         # Start background price updates
         self.running = True
+        self._stop_event = threading.Event()
+        self.streaming = False  # True while the price stream is connected
         self.update_thread = threading.Thread(target=self._background_updates, daemon=True)
         self.update_thread.start()
+        
+        # Optionally push prices from the Binance stream; polling stays as
+        # the startup warm-up (it also supplies market caps) and the fallback
+        self.stream_thread = None
+        if enable_stream:
+            if websockets is None:
+                logger.warning("websockets not installed - price streaming disabled, polling instead")
+            else:
+                self.stream_thread = threading.Thread(target=self._run_stream, daemon=True)
+                self.stream_thread.start()
     
     def _background_updates(self):
         """Background thread for updating prices"""
         while self.running:
             try:
-                self.update_prices()
-                time.sleep(self.update_interval)
+                if not self.streaming:
+                    self.update_prices()
+                if self._stop_event.wait(self.update_interval):
+                    break
             except Exception as e:
-                self.logger.error(f"Error in background price updates: {e}")
-                time.sleep(60)  # Wait longer on error
+                logger.error(f"Error in background price updates: {e}")
+                if self._stop_event.wait(60):  # Wait longer on error
+                    break
     
     def _make_request(self, url: str, params: Dict = None) -> Optional[Dict]:
-        """Make HTTP request using urllib"""
+        """Make HTTP request over the shared keep-alive session (_NOT_MODIFIED on 304)"""
         try:
             if params:
                 query_string = urllib.parse.urlencode(params)
                 url = f"{url}?{query_string}"
             
-            # Create request with headers
-            req = urllib.request.Request(url)
-            req.add_header('User-Agent', 'ExpectoPatronum/1.0')
+            # Revalidate against the previous response when possible
+            request_headers = _REQUEST_HEADERS
+            etag = self._etag.get(url)
+            last_mod = self._last_mod.get(url)
+            if etag or last_mod:
+                request_headers = dict(_REQUEST_HEADERS)
+                if etag:
+                    request_headers['If-None-Match'] = etag
+                if last_mod:
+                    request_headers['If-Modified-Since'] = last_mod
+            
+            # Make request - the session adapter retries rate limits and gateway errors
+            response = _SESSION.get(url, headers=request_headers, timeout=10)
+            status = response.status_code
+            headers = response.headers
+            
+            if status == 304:
+                return _NOT_MODIFIED
             
-            # Make request
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = response.read()
-                return json.loads(data.decode('utf-8'))
+            if status != 200:
+                logger.error(f"Request failed: HTTP {status} {response.reason}")
+                return None
+            
+            etag = headers.get('ETag')
+            if etag:
+                self._etag[url] = etag
+            last_mod = headers.get('Last-Modified')
+            if last_mod:
+                self._last_mod[url] = last_mod
+            
+            return json_loads(response.content)
                 
         except Exception as e:
-            self.logger.error(f"Request failed: {e}")
+            logger.error(f"Request failed: {e}")
             return None
     
     def update_prices(self) -> bool:
         """Update prices for all supported cryptocurrencies"""
         try:
-            # Get list of coin IDs
-            coin_ids = list(set(self.supported_coins.values()))
-            coin_ids_str = ','.join(coin_ids)
-            
             # Fetch current prices
             url = f"{self.base_url}/simple/price"
             params = {
-                'ids': coin_ids_str,
+                'ids': self._coin_ids_csv,
                 'vs_currencies': 'usd',
                 'include_24hr_change': 'true',
                 'include_market_cap': 'true'
             }
             
             data = self._make_request(url, params)
+            
+            now_us = time.time_ns() // 1000
+            current_time = datetime.fromtimestamp(now_us / 1_000_000)
+            
+            if data is _NOT_MODIFIED:
+                # Prices unchanged since the last poll - just refresh freshness
+                with self._lock:
+                    self.last_update = dict.fromkeys(self.prices, current_time)
+                logger.debug("Prices not modified since last update")
+                return True
+            
             if not data:
                 return False
             
-            current_time = datetime.now()
-            
-            # Update prices
+            # Build the updated entries off to the side
+            new_prices = {}
             for coin_id, price_data in data.items():
                 if 'usd' in price_data:
+                    coin_id = sys.intern(coin_id)
                     price = price_data['usd']
                     change_24h = price_data.get('usd_24h_change', 0)
                     market_cap = price_data.get('usd_market_cap', 0)
                     
-                    self.prices[coin_id] = {
+                    new_prices[coin_id] = {
                         'price': price,
                         'change_24h': change_24h,
                         'market_cap': market_cap,
                         'timestamp': current_time
                     }
                     
-                    # Store price history (keep last 1000 points)
-                    self.price_history[coin_id].append({
-                        'price': price,
-                        'timestamp': current_time
-                    })
-                    
-                    if len(self.price_history[coin_id]) > 1000:
-                        self.price_history[coin_id] = self.price_history[coin_id][-1000:]
-                    
-                    self.last_update[coin_id] = current_time
+                    # Store price history (the ring buffer keeps the last 1000 points)
+                    self.price_history[coin_id].append(now_us, price)
             
-            self.logger.info(f"Updated prices for {len(data)} cryptocurrencies")
+            self._publish(new_prices, current_time)
+            logger.info(f"Updated prices for {len(data)} cryptocurrencies")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error updating prices: {e}")
+            logger.error(f"Error updating prices: {e}")
             return False
     
+    def _publish(self, new_prices: Dict, current_time: datetime):
+        """Swap in new price snapshots - readers see either the old or the new dict"""
+        with self._lock:
+            prices = dict(self.prices)
+            prices.update(new_prices)
+            last_update = dict(self.last_update)
+            last_update.update(dict.fromkeys(new_prices, current_time))
+            self.prices = prices
+            self.last_update = last_update
+            self._market_stats = self._rank_market(prices)
+        
+        self.ready_event.set()
+    
+    @staticmethod
+    def _rank_market(prices: Dict) -> Dict:
+        """Compute top gainers/losers and total market cap for a price snapshot"""
+        items = list(prices.items())
+        # Rank by 24h change - only the top and bottom 5 are needed
+        gainers = heapq.nlargest(5, items, key=lambda x: x[1]['change_24h'])
+        # Reversed so the biggest loser comes last, as with a full sort
+        losers = heapq.nsmallest(5, items, key=lambda x: x[1]['change_24h'])[::-1]
+        
+        return {
+            'total_coins': len(items),
+            'top_gainers': [
+                {'symbol': coin_id, 'price': data['price'], 'change_24h': data['change_24h']}
+                for coin_id, data in gainers
+            ],
+            'top_losers': [
+                {'symbol': coin_id, 'price': data['price'], 'change_24h': data['change_24h']}
+                for coin_id, data in losers
+            ],
+            'total_market_cap': sum(data['market_cap'] for _, data in items)
+        }
+    
+    def _run_stream(self):
+        """Background thread running the price stream event loop"""
+        asyncio.run(self._stream_prices())
+    
+    async def _stream_prices(self):
+        """Consume the Binance mini ticker stream, reconnecting until stopped"""
+        while self.running:
+            try:
+                async with websockets.connect(BINANCE_STREAM_URL) as ws:
+                    self.streaming = True
+                    logger.info("Connected to Binance price stream")
+                    async for message in ws:
+                        if not self.running:
+                            break
+                        self._apply_tickers(json_loads(message))
+            except Exception as e:
+                logger.error(f"Price stream error: {e}")
+            finally:
+                self.streaming = False
+            
+            if await asyncio.to_thread(self._stop_event.wait, STREAM_RECONNECT_DELAY):
+                break
+    
+    def _apply_tickers(self, tickers: List[Dict]):
+        """Apply a batch of Binance mini tickers to the price snapshots"""
+        now_us = time.time_ns() // 1000
+        current_time = datetime.fromtimestamp(now_us / 1_000_000)
+        snapshot = self.prices
+        
+        new_prices = {}
+        for ticker in tickers:
+            coin_id = BINANCE_SYMBOLS.get(ticker.get('s'))
+            if coin_id is None:
+                continue
+            
+            price = float(ticker['c'])
+            open_price = float(ticker['o'])
+            change_24h = (price - open_price) / open_price * 100 if open_price else 0
+            
+            # The stream has no market cap - keep the last polled value
+            previous = snapshot.get(coin_id)
+            market_cap = previous['market_cap'] if previous else 0
+            
+            new_prices[coin_id] = {
+                'price': price,
+                'change_24h': change_24h,
+                'market_cap': market_cap,
+                'timestamp': current_time
+            }
+            self.price_history[coin_id].append(now_us, price)
+        
+        if new_prices:
+            self._publish(new_prices, current_time)
+    
+    def _resolve(self, symbol: str) -> Optional[str]:
+        """Map a symbol or alias to its coin id, lowercasing only when needed"""
+        coin_id = self.supported_coins.get(symbol)
+        if coin_id is None:
+            coin_id = self.supported_coins.get(symbol.lower())
+        return coin_id
+    
+    def get_price_by_id(self, coin_id: str) -> Optional[float]:
+        """Get current price for an already-normalized coin id"""
+        price_data = self.prices.get(coin_id)
+        return price_data['price'] if price_data is not None else None
+    
     def get_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol"""
         try:
             # Normalize symbol
-            symbol_lower = symbol.lower()
-            coin_id = self.supported_coins.get(symbol_lower)
+            coin_id = self._resolve(symbol)
             
             if not coin_id:
-                self.logger.warning(f"Unsupported symbol: {symbol}")
+                logger.warning(f"Unsupported symbol: {symbol}")
                 return None
             
-            if coin_id not in self.prices:
+            price_data = self.prices.get(coin_id)
+            if price_data is None:
                 return None
             
-            return self.prices[coin_id]['price']
+            return price_data['price']
             
         except Exception as e:
-            self.logger.error(f"Error getting price for {symbol}: {e}")
+            logger.error(f"Error getting price for {symbol}: {e}")
             return None
     
     def get_price_data(self, symbol: str) -> Optional[Dict]:
         """Get complete price data for a symbol"""
         try:
-            symbol_lower = symbol.lower()
-            coin_id = self.supported_coins.get(symbol_lower)
+            coin_id = self._resolve(symbol)
             
-            if not coin_id or coin_id not in self.prices:
+            price_data = self.prices.get(coin_id) if coin_id else None
+            if price_data is None:
                 return None
             
-            return self.prices[coin_id].copy()
+            return price_data.copy()
             
         except Exception as e:
-            self.logger.error(f"Error getting price data for {symbol}: {e}")
+            logger.error(f"Error getting price data for {symbol}: {e}")
             return None
     
-    def get_price_history(self, symbol: str, hours: int = 24) -> List[Dict]:
-        """Get price history for a symbol"""
+    def get_price_series(self, symbol: str, hours: int = 24) -> Tuple[array, array]:
+        """Get (timestamps, prices) arrays for a symbol; timestamps are unix microseconds"""
         try:
-            symbol_lower = symbol.lower()
-            coin_id = self.supported_coins.get(symbol_lower)
+            coin_id = self._resolve(symbol)
             
             if not coin_id or coin_id not in self.price_history:
-                return []
+                return array('q'), array('d')
             
-            # Filter history by time
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            history = [
-                point for point in self.price_history[coin_id]
-                if point['timestamp'] >= cutoff_time
-            ]
-            
-            return history
+            cutoff_us = time.time_ns() // 1000 - hours * 3_600_000_000
+            return self.price_history[coin_id].since(cutoff_us)
             
         except Exception as e:
-            self.logger.error(f"Error getting price history for {symbol}: {e}")
-            return []
+            logger.error(f"Error getting price series for {symbol}: {e}")
+            return array('q'), array('d')
+    
+    def get_latest_timestamp(self, symbol: str) -> Optional[int]:
+        """Get the unix-microsecond timestamp of the newest price point for a symbol"""
+        coin_id = self._resolve(symbol)
+        history = self.price_history.get(coin_id)
+        return history.latest() if history is not None else None
+    
+    def get_price_history(self, symbol: str, hours: int = 24) -> List[Dict]:
+        """Get price history for a symbol"""
+        timestamps, prices = self.get_price_series(symbol, hours)
+        fromtimestamp = datetime.fromtimestamp
+        return [
+            {'price': price, 'timestamp': fromtimestamp(ts / 1_000_000)}
+            for ts, price in zip(timestamps, prices)
+        ]
     
     def get_all_prices(self) -> Dict:
         """Get prices for all supported cryptocurrencies"""
@@ -203,63 +471,42 @@ class MarketDataProvider:
         """Get list of supported symbols"""
         return list(self.supported_coins.keys())
     
+    def _format_coin_ids(self) -> str:
+        """Comma-separated coin ids for the /simple/price query"""
+        return ','.join(sorted(set(self.supported_coins.values())))
+    
     def add_symbol_alias(self, alias: str, coin_id: str):
         """Add a new symbol alias"""
-        self.supported_coins[alias.lower()] = coin_id
-        self.logger.info(f"Added symbol alias: {alias} -> {coin_id}")
+        coin_id = sys.intern(coin_id)
+        self.supported_coins[sys.intern(alias.lower())] = coin_id
+        if coin_id not in self.price_history:
+            self.price_history[coin_id] = PriceHistoryBuffer()
+            self._coin_ids_csv = self._format_coin_ids()
+        logger.info(f"Added symbol alias: {alias} -> {coin_id}")
     
     def get_market_summary(self) -> Dict:
         """Get market summary with top gainers/losers"""
         try:
-            summary = {
-                'total_coins': len(self.prices),
+            # Rankings are computed when prices are published, so this is O(1)
+            market_stats = self._market_stats
+            return {
+                'total_coins': market_stats['total_coins'],
                 'last_update': datetime.now(),
-                'top_gainers': [],
-                'top_losers': [],
-                'total_market_cap': 0
+                'top_gainers': [entry.copy() for entry in market_stats['top_gainers']],
+                'top_losers': [entry.copy() for entry in market_stats['top_losers']],
+                'total_market_cap': market_stats['total_market_cap']
             }
             
-            # Sort by 24h change
-            sorted_coins = sorted(
-                self.prices.items(),
-                key=lambda x: x[1]['change_24h'],
-                reverse=True
-            )
-            
-            # Top gainers (top 5)
-            summary['top_gainers'] = [
-                {
-                    'symbol': coin_id,
-                    'price': data['price'],
-                    'change_24h': data['change_24h']
-                }
-                for coin_id, data in sorted_coins[:5]
-            ]
-            
-            # Top losers (bottom 5)
-            summary['top_losers'] = [
-                {
-                    'symbol': coin_id,
-                    'price': data['price'],
-                    'change_24h': data['change_24h']
-                }
-                for coin_id, data in sorted_coins[-5:]
-            ]
-            
-            # Total market cap
-            summary['total_market_cap'] = sum(
-                data['market_cap'] for data in self.prices.values()
-            )
-            
-            return summary
-            
         except Exception as e:
-            self.logger.error(f"Error getting market summary: {e}")
+            logger.error(f"Error getting market summary: {e}")
             return {}
     
     def stop(self):
         """Stop the market data provider"""
         self.running = False
+        self._stop_event.set()
         if self.update_thread.is_alive():
             self.update_thread.join(timeout=5)
-        self.logger.info("Market data provider stopped")
\ No newline at end of file
+        if self.stream_thread is not None and self.stream_thread.is_alive():
+            self.stream_thread.join(timeout=5)
+        logger.info("Market data provider stopped")
\ No newline at end of file
@@ -3,18 +3,27 @@ Portfolio Management - Magical position tracking and P&L calculations
 """
 
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+logger = logging.getLogger(__name__)
+
 class Portfolio:
     """Magical portfolio manager for tracking positions and calculating P&L"""
     
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.positions = {}  # symbol -> list of positions
+        self.open_positions = {}  # symbol -> {'LONG': [...], 'SHORT': [...]} of open positions
+        # symbol -> [long_amount, short_amount, short_cost] over open positions
+        self._exposure = {}
+        self._position_count = 0  # all positions held in self.positions
+        self._open_position_count = 0
         self.cash = 10000.0  # Starting cash in USD
         self.initial_cash = 10000.0
+        self.version = 0  # Bumped on every change to positions, cash or stats
         
         # Portfolio stats
         self.stats = {
@@ -25,9 +34,6 @@ class Portfolio:
             'total_trades': 0
         }
         
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
-        
         # Load existing positions from database
         self._load_positions()
     
@@ -40,20 +46,80 @@ class Portfolio:
                 if symbol not in self.positions:
                     self.positions[symbol] = []
                 
-                self.positions[symbol].append({
+                loaded = {
                     'trade_id': position['trade_id'],
                     'type': position['type'],
                     'amount': position['amount'],
                     'entry_price': position['entry_price'],
                     'entry_time': position['entry_time'],
                     'status': 'OPEN'
-                })
+                }
+                self.positions[symbol].append(loaded)
+                self._open_bucket(symbol, loaded['type']).append(loaded)
+                self._position_count += 1
+                self._open_position_count += 1
+            
+            for symbol in self.positions:
+                self._recompute_exposure(symbol)
         except Exception as e:
-            self.logger.error(f"Error loading positions: {e}")
+            logger.error(f"Error loading positions: {e}")
+    
+    def _open_bucket(self, symbol: str, position_type: str) -> List[Dict]:
+        """Get the open-position list for a symbol and position type"""
+        buckets = self.open_positions.get(symbol)
+        if buckets is None:
+            buckets = self.open_positions[symbol] = {'LONG': [], 'SHORT': []}
+        return buckets[position_type]
+    
+    @contextmanager
+    def atomic(self, symbol: str):
+        """Restore a symbol's positions, cash and stats if the block raises (e.g. a failed DB transaction)"""
+        positions = self.positions.get(symbol)
+        saved_positions = None if positions is None else list(positions)
+        buckets = self.open_positions.get(symbol)
+        saved_buckets = None if buckets is None else {k: list(v) for k, v in buckets.items()}
+        # Closing mutates open position dicts in place; closed ones never change
+        saved_open = [(p, p.copy()) for bucket in (buckets or {}).values() for p in bucket]
+        exposure = self._exposure.get(symbol)
+        saved_exposure = None if exposure is None else list(exposure)
+        saved_stats = dict(self.stats)
+        saved_scalars = (self.cash, self._position_count, self._open_position_count, self.version)
+        
+        try:
+            yield
+        except BaseException:
+            for target, saved in ((self.positions, saved_positions),
+                                  (self.open_positions, saved_buckets),
+                                  (self._exposure, saved_exposure)):
+                if saved is None:
+                    target.pop(symbol, None)
+                else:
+                    target[symbol] = saved
+            for position, saved in saved_open:
+                position.clear()
+                position.update(saved)
+            self.stats.clear()
+            self.stats.update(saved_stats)
+            self.cash, self._position_count, self._open_position_count, self.version = saved_scalars
+            logger.warning(f"Rolled back in-memory changes for {symbol}")
+            raise
+    
+    def _recompute_exposure(self, symbol: str):
+        """Rebuild the open-position aggregates for a symbol from scratch"""
+        buckets = self.open_positions.get(symbol, {})
+        long_amount = sum(p['amount'] for p in buckets.get('LONG', ()))
+        short_amount = short_cost = 0.0
+        for position in buckets.get('SHORT', ()):
+            short_amount += position['amount']
+            short_cost += position['amount'] * position['entry_price']
+        self._exposure[symbol] = [long_amount, short_amount, short_cost]
     
-    def open_long_position(self, symbol: str, amount: float, price: float) -> Dict:
-        """Open a long position"""
+    def open_long_position(self, symbol: str, amount: float, price: float,
+                           timestamp: Optional[datetime] = None) -> Dict:
+        """Open a long position (timestamp defaults to now)"""
         try:
+            now = timestamp or datetime.now()
+            
             # Check if we have enough cash
             required_cash = amount * price
             if required_cash > self.cash:
@@ -63,7 +129,7 @@ class Portfolio:
                 }
             
             # Generate trade ID
-            trade_id = str(uuid.uuid4())
+            trade_id = uuid.uuid4().hex
             
             # Create position
             position = {
@@ -71,29 +137,35 @@ class Portfolio:
                 'type': 'LONG',
                 'amount': amount,
                 'entry_price': price,
-                'entry_time': datetime.now(),
+                'entry_time': now,
                 'status': 'OPEN'
             }
             
-            # Add to positions
-            if symbol not in self.positions:
-                self.positions[symbol] = []
-            self.positions[symbol].append(position)
-            
-            # Deduct cash
-            self.cash -= required_cash
-            
-            # Save to database
+            # Save to database first, so a failed write leaves memory untouched
             self.db_manager.save_position(
                 trade_id=trade_id,
                 symbol=symbol,
                 position_type='LONG',
                 amount=amount,
                 entry_price=price,
-                entry_time=datetime.now()
+                entry_time=now
             )
             
-            self.logger.info(f"Opened LONG position: {amount} {symbol} at ${price:,.2f}")
+            # Add to positions
+            if symbol not in self.positions:
+                self.positions[symbol] = []
+            self.positions[symbol].append(position)
+            self._open_bucket(symbol, 'LONG').append(position)
+            self._position_count += 1
+            self._open_position_count += 1
+            exposure = self._exposure.setdefault(symbol, [0.0, 0.0, 0.0])
+            exposure[0] += amount
+            
+            # Deduct cash
+            self.cash -= required_cash
+            self.version += 1
+            
+            logger.info(f"Opened LONG position: {amount} {symbol} at ${price:,.2f}")
             
             return {
                 'success': True,
@@ -102,15 +174,18 @@ class Portfolio:
             }
             
         except Exception as e:
-            self.logger.error(f"Error opening long position: {e}")
+            logger.error(f"Error opening long position: {e}")
             return {
                 'success': False,
                 'message': f'Error opening position: {str(e)}'
             }
     
-    def open_short_position(self, symbol: str, amount: float, price: float) -> Dict:
-        """Open a short position"""
+    def open_short_position(self, symbol: str, amount: float, price: float,
+                            timestamp: Optional[datetime] = None) -> Dict:
+        """Open a short position (timestamp defaults to now)"""
         try:
+            now = timestamp or datetime.now()
+            
             # For short positions, we need margin (simplified)
             margin_required = amount * price * 0.1  # 10% margin
             if margin_required > self.cash:
@@ -120,7 +195,7 @@ class Portfolio:
                 }
             
             # Generate trade ID
-            trade_id = str(uuid.uuid4())
+            trade_id = uuid.uuid4().hex
             
             # Create position
             position = {
@@ -128,29 +203,36 @@ class Portfolio:
                 'type': 'SHORT',
                 'amount': amount,
                 'entry_price': price,
-                'entry_time': datetime.now(),
+                'entry_time': now,
                 'status': 'OPEN'
             }
             
-            # Add to positions
-            if symbol not in self.positions:
-                self.positions[symbol] = []
-            self.positions[symbol].append(position)
-            
-            # Deduct margin
-            self.cash -= margin_required
-            
-            # Save to database
+            # Save to database first, so a failed write leaves memory untouched
             self.db_manager.save_position(
                 trade_id=trade_id,
                 symbol=symbol,
                 position_type='SHORT',
                 amount=amount,
                 entry_price=price,
-                entry_time=datetime.now()
+                entry_time=now
             )
             
-            self.logger.info(f"Opened SHORT position: {amount} {symbol} at ${price:,.2f}")
+            # Add to positions
+            if symbol not in self.positions:
+                self.positions[symbol] = []
+            self.positions[symbol].append(position)
+            self._open_bucket(symbol, 'SHORT').append(position)
+            self._position_count += 1
+            self._open_position_count += 1
+            exposure = self._exposure.setdefault(symbol, [0.0, 0.0, 0.0])
+            exposure[1] += amount
+            exposure[2] += amount * price
+            
+            # Deduct margin
+            self.cash -= margin_required
+            self.version += 1
+            
+            logger.info(f"Opened SHORT position: {amount} {symbol} at ${price:,.2f}")
             
             return {
                 'success': True,
@@ -159,15 +241,18 @@ class Portfolio:
             }
             
         except Exception as e:
-            self.logger.error(f"Error opening short position: {e}")
+            logger.error(f"Error opening short position: {e}")
             return {
                 'success': False,
                 'message': f'Error opening position: {str(e)}'
             }
     
-    def close_positions(self, symbol: str, position_type: str = 'ALL', current_price: float = None) -> Dict:
-        """Close positions for a symbol"""
+    def close_positions(self, symbol: str, position_type: str = 'ALL', current_price: float = None,
+                        timestamp: Optional[datetime] = None) -> Dict:
+        """Close positions for a symbol (timestamp defaults to now)"""
         try:
+            now = timestamp or datetime.now()
+            
             if symbol not in self.positions or not self.positions[symbol]:
                 return {
                     'success': False,
@@ -178,11 +263,11 @@ class Portfolio:
             total_amount = 0.0
             total_pnl = 0.0
             
-            # Filter positions to close
-            positions_to_close = []
-            for position in self.positions[symbol]:
-                if position['status'] == 'OPEN' and (position_type == 'ALL' or position['type'] == position_type):
-                    positions_to_close.append(position)
+            # Collect the positions to close from the open index
+            buckets = self.open_positions.get(symbol, {})
+            types_to_close = [t for t in (buckets.keys() if position_type == 'ALL' else (position_type,))
+                              if buckets.get(t)]
+            positions_to_close = [position for t in types_to_close for position in buckets[t]]
             
             if not positions_to_close:
                 return {
@@ -190,9 +275,10 @@ class Portfolio:
                     'message': f'No {position_type} positions to close for {symbol}'
                 }
             
-            # Close each position
+            # Work out P&L for each position before touching any state
+            closed_rows = []
+            settlements = []
             for position in positions_to_close:
-                # Calculate P&L
                 if position['type'] == 'LONG':
                     pnl = (current_price - position['entry_price']) * position['amount']
                     cash_return = position['amount'] * current_price
@@ -200,23 +286,25 @@ class Portfolio:
                     pnl = (position['entry_price'] - current_price) * position['amount']
                     cash_return = position['amount'] * position['entry_price'] * 0.1  # Return margin
                 
+                closed_rows.append((position['trade_id'], current_price, now, pnl))
+                settlements.append((position, pnl, cash_return))
+            
+            # Update database first, so a failed write leaves memory untouched
+            self.db_manager.close_positions_bulk(closed_rows)
+            
+            for type_to_close in types_to_close:
+                buckets[type_to_close].clear()
+            
+            for position, pnl, cash_return in settlements:
                 # Update cash
                 self.cash += cash_return
                 
                 # Mark position as closed
                 position['status'] = 'CLOSED'
                 position['exit_price'] = current_price
-                position['exit_time'] = datetime.now()
+                position['exit_time'] = now
                 position['pnl'] = pnl
                 
-                # Update database
-                self.db_manager.close_position(
-                    trade_id=position['trade_id'],
-                    exit_price=current_price,
-                    exit_time=datetime.now(),
-                    pnl=pnl
-                )
-                
                 closed_trades.append({
                     'trade_id': position['trade_id'],
                     'type': position['type'],
@@ -236,11 +324,16 @@ class Portfolio:
                 else:
                     self.stats['losing_trades'] += 1
             
+            # Recompute rather than subtract, so float error can't accumulate
+            self._recompute_exposure(symbol)
+            self._open_position_count -= len(positions_to_close)
+            
             # Update total P&L
             self.stats['total_pnl'] += total_pnl
             self.stats['total_pnl_percent'] = (self.stats['total_pnl'] / self.initial_cash) * 100
+            self.version += 1
             
-            self.logger.info(f"Closed {len(closed_trades)} positions for {symbol}, P&L: ${total_pnl:,.2f}")
+            logger.info(f"Closed {len(closed_trades)} positions for {symbol}, P&L: ${total_pnl:,.2f}")
             
             return {
                 'success': True,
@@ -251,7 +344,7 @@ class Portfolio:
             }
             
         except Exception as e:
-            self.logger.error(f"Error closing positions: {e}")
+            logger.error(f"Error closing positions: {e}")
             return {
                 'success': False,
                 'message': f'Error closing positions: {str(e)}'
@@ -263,22 +356,22 @@ class Portfolio:
             total_value = self.cash
             position_values = {}
             
-            for symbol, positions in self.positions.items():
-                if symbol in current_prices:
-                    current_price = current_prices[symbol]
-                    symbol_value = 0.0
-                    
-                    for position in positions:
-                        if position['status'] == 'OPEN':
-                            if position['type'] == 'LONG':
-                                symbol_value += position['amount'] * current_price
-                            else:  # SHORT
-                                # For shorts, we track unrealized P&L
-                                unrealized_pnl = (position['entry_price'] - current_price) * position['amount']
-                                symbol_value += unrealized_pnl
-                    
-                    position_values[symbol] = symbol_value
-                    total_value += symbol_value
+            for symbol, (long_amount, short_amount, short_cost) in self._exposure.items():
+                current_price = current_prices.get(symbol)
+                if current_price is None:
+                    continue
+                
+                buckets = self.open_positions.get(symbol)
+                if not buckets or not (buckets['LONG'] or buckets['SHORT']):
+                    position_values[symbol] = 0.0  # Everything closed
+                    continue
+                
+                # Longs are worth their market value; for shorts we track
+                # unrealized P&L: sum((entry - price) * amount)
+                symbol_value = long_amount * current_price + short_cost - short_amount * current_price
+                
+                position_values[symbol] = symbol_value
+                total_value += symbol_value
             
             return {
                 'total_value': total_value,
@@ -289,7 +382,7 @@ class Portfolio:
             }
             
         except Exception as e:
-            self.logger.error(f"Error calculating portfolio value: {e}")
+            logger.error(f"Error calculating portfolio value: {e}")
             return {
                 'total_value': self.cash,
                 'cash': self.cash,
@@ -312,7 +405,7 @@ class Portfolio:
                         all_positions.append(position_copy)
                 return all_positions
         except Exception as e:
-            self.logger.error(f"Error getting positions: {e}")
+            logger.error(f"Error getting positions: {e}")
             return []
     
     def get_portfolio_stats(self) -> Dict:
@@ -321,14 +414,17 @@ class Portfolio:
             **self.stats,
             'cash': self.cash,
             'initial_cash': self.initial_cash,
-            'total_positions': sum(len(positions) for positions in self.positions.values()),
-            'open_positions': sum(len([p for p in positions if p['status'] == 'OPEN']) 
-                                for positions in self.positions.values())
+            'total_positions': self._position_count,
+            'open_positions': self._open_position_count
         }
     
     def reset_portfolio(self):
         """Reset portfolio to initial state (for testing)"""
         self.positions = {}
+        self.open_positions = {}
+        self._exposure = {}
+        self._position_count = 0
+        self._open_position_count = 0
         self.cash = self.initial_cash
         self.stats = {
             'total_pnl': 0.0,
@@ -337,5 +433,6 @@ class Portfolio:
             'losing_trades': 0,
             'total_trades': 0
         }
+        self.version += 1
         self.db_manager.reset_portfolio()
-        self.logger.info("Portfolio reset to initial state")
\ No newline at end of file
+        logger.info("Portfolio reset to initial state")
\ No newline at end of file
@@ -2,15 +2,74 @@
 Recall API Connector - Modular integration for Recall API
 """
 
-import json
-import urllib.request
-import urllib.parse
-import urllib.error
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, Mapping
+import asyncio
 import logging
 from datetime import datetime
+from dataclasses import asdict, is_dataclass
 import threading
 import time
+import random
+from collections import deque
+from types import MappingProxyType
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .http_client import json_dumps, json_loads
+
+# Operations accepted by RecallAPIConnector.batch and queue_op
+BATCH_OPS = ('order', 'portfolio_sync', 'status')
+
+# Batch endpoint statuses meaning the API has no such route at all
+_BATCH_UNSUPPORTED = frozenset((404, 405, 501))
+
+# Auto-sync sends of a queued operation before it is dropped, and the most
+# operations kept waiting (the oldest are dropped beyond that)
+MAX_OP_ATTEMPTS = 5
+MAX_PENDING_OPS = 1000
+
+# Upper bound for a single retry wait, in seconds
+MAX_RETRY_DELAY = 30
+
+# Client errors worth retrying (timeout, rate limit); any other 4xx is final
+_RETRYABLE_CLIENT_ERRORS = frozenset((408, 429))
+
+# Plain ASCII log tags - safe for any log handler encoding
+_TAG_OK = '[OK]'
+_TAG_ERR = '[ERR]'
+_TAG_SYNC = '[SYNC]'
+_TAG_CONFIG = '[CONFIG]'
+_TAG_CONN = '[CONN]'
+
+# Hosts the shared session keeps pools for, and idle keep-alive connections
+# kept per host (tunable with RecallAPIConnector.configure_pool)
+POOL_CONNECTIONS = 2
+POOL_MAXSIZE = 16
+
+# Keep-alive HTTP session shared by every connector in the process; retries
+# are left to RecallAPIConnector._make_request so they follow the config
+_GLOBAL_POOL = requests.Session()
+
+def _mount_pool(maxsize: int):
+    """Mount a connection pool adapter of the given size on the shared session"""
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=maxsize)
+    _GLOBAL_POOL.mount('https://', adapter)
+    _GLOBAL_POOL.mount('http://', adapter)
+
+_mount_pool(POOL_MAXSIZE)
+
+def _now_ms() -> int:
+    """Current unix time in integer milliseconds"""
+    return time.time_ns() // 1_000_000
+
+def _format_ms(ms: int) -> str:
+    """Format a unix millisecond timestamp as local ISO 8601"""
+    return datetime.fromtimestamp(ms / 1000).isoformat(timespec='milliseconds')
+
+def _backoff(attempt: int, base: float) -> float:
+    """Exponential backoff with jitter for the given retry attempt (0-based)"""
+    return min(base * (2 ** attempt) + random.random() * base, MAX_RETRY_DELAY)
 
 class RecallAPIConnector:
     """Modular connector for Recall API integration"""
@@ -20,7 +79,7 @@ class RecallAPIConnector:
         Initialize the Recall API connector
         
         Args:
-            config: Configuration dictionary with API settings
+            config: Configuration dictionary (or RecallConfig) with API settings
         """
         # Default configuration
         self.default_config = {
@@ -36,22 +95,43 @@ class RecallAPIConnector:
             'sync_interval': 60  # seconds
         }
         
+        # Accept typed configs (e.g. RecallConfig) as well as mappings
+        if is_dataclass(config):
+            config = asdict(config)
+        
         # Merge provided config with defaults
         self.config = {**self.default_config, **(config or {})}
         
+        # Headers and endpoint URLs, rebuilt whenever the config changes
+        self._rebuild_cached()
+        
+        # Keep-alive HTTP connections, shared with other connectors
+        self._http = _GLOBAL_POOL
+        
         # Connection state
         self.connected = False
-        self.last_sync = None
+        self._connect_lock = threading.Lock()
+        self.last_sync = None  # unix ms of the last successful portfolio sync
         self.sync_thread = None
         self.running = False
+        self._stop_evt = threading.Event()
+        
+        # Cleared once the API answers 404 on the batch endpoint
+        self._batch_supported = True
+        
+        # Operations waiting for the next auto-sync batch
+        self._pending_ops = deque(maxlen=MAX_PENDING_OPS)
+        self._pending_lock = threading.Lock()
         
-        # Portfolio cache
-        self.portfolio_cache = {}
-        self.competition_status_cache = {}
+        # Portfolio and competition status caches - an immutable snapshot that
+        # writers copy and rebind under _cache_lock, so readers never lock
+        self._cache_lock = threading.Lock()
+        self._caches = MappingProxyType({
+            'portfolio': MappingProxyType({}),
+            'competition_status': MappingProxyType({})
+        })
         
-        # Setup logging
-        if self.config['enable_logging']:
-            logging.basicConfig(level=logging.INFO)
+        # Logging is configured by the application
         self.logger = logging.getLogger(__name__)
         
         # Start auto-sync if enabled
@@ -74,14 +154,11 @@ class RecallAPIConnector:
                 }
             
             # Test connection by making a simple API call
-            test_url = f"{self.config['api_base_url']}/health"
-            headers = self._get_headers()
-            
-            response = self._make_request(test_url, headers=headers, method='GET')
+            response = self._make_request(self._health_url, method='GET')
             
             if response and response.get('status') == 'healthy':
                 self.connected = True
-                self.logger.info("✅ Successfully connected to Recall API")
+                self.logger.info("%s Successfully connected to Recall API", _TAG_OK)
                 return {
                     'success': True,
                     'message': 'Successfully connected to Recall API',
@@ -100,7 +177,7 @@ class RecallAPIConnector:
                 
         except Exception as e:
             self.connected = False
-            self.logger.error(f"Error connecting to Recall API: {e}")
+            self.logger.error("Error connecting to Recall API: %s", e)
             return {
                 'success': False,
                 'message': f'Connection error: {str(e)}',
@@ -108,6 +185,16 @@ class RecallAPIConnector:
                 'error': str(e)
             }
     
+    def _ensure_connected(self) -> bool:
+        """Connect on first use - concurrent callers share a single connect attempt"""
+        if self.connected:
+            return True
+        
+        with self._connect_lock:
+            if self.connected:  # Another thread connected while we waited
+                return True
+            return self.connect_to_recall()['success']
+    
     def submit_order_to_competition(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Submit a trading order to the Recall competition
@@ -119,14 +206,12 @@ class RecallAPIConnector:
             Dict containing submission status and order details
         """
         try:
-            if not self.connected:
-                connect_result = self.connect_to_recall()
-                if not connect_result['success']:
-                    return {
-                        'success': False,
-                        'message': 'Not connected to Recall API',
-                        'order_id': None
-                    }
+            if not self._ensure_connected():
+                return {
+                    'success': False,
+                    'message': 'Not connected to Recall API',
+                    'order_id': None
+                }
             
             if not self.config['competition_id']:
                 return {
@@ -135,37 +220,16 @@ class RecallAPIConnector:
                     'order_id': None
                 }
             
-            # Prepare order payload
-            order_payload = {
-                'competition_id': self.config['competition_id'],
-                'user_id': self.config['user_id'],
-                'symbol': order_data.get('symbol'),
-                'amount': order_data.get('amount'),
-                'order_type': order_data.get('type', 'MARKET'),  # MARKET, LIMIT, etc.
-                'side': order_data.get('side', 'BUY'),  # BUY, SELL
-                'timestamp': datetime.now().isoformat(),
-                'metadata': {
-                    'source': 'expecto_patronum',
-                    'spell_cast': order_data.get('spell', 'UNKNOWN'),
-                    'portfolio_value': order_data.get('portfolio_value'),
-                    'risk_score': order_data.get('risk_score', 0.0)
-                }
-            }
-            
             # Submit order
-            url = f"{self.config['api_base_url']}/competitions/{self.config['competition_id']}/orders"
-            headers = self._get_headers()
-            
             response = self._make_request(
-                url, 
-                headers=headers, 
+                self._orders_url, 
                 method='POST', 
-                data=json.dumps(order_payload)
+                data=self._order_body(order_data)
             )
             
             if response and response.get('success'):
                 order_id = response.get('order_id')
-                self.logger.info(f"✅ Order submitted successfully: {order_id}")
+                self.logger.info("%s Order submitted successfully: %s", _TAG_OK, order_id)
                 return {
                     'success': True,
                     'message': 'Order submitted to competition successfully',
@@ -176,7 +240,7 @@ class RecallAPIConnector:
                 }
             else:
                 error_msg = response.get('error', 'Unknown error') if response else 'No response'
-                self.logger.error(f"❌ Order submission failed: {error_msg}")
+                self.logger.error("%s Order submission failed: %s", _TAG_ERR, error_msg)
                 return {
                     'success': False,
                     'message': f'Order submission failed: {error_msg}',
@@ -185,7 +249,7 @@ class RecallAPIConnector:
                 }
                 
         except Exception as e:
-            self.logger.error(f"Error submitting order: {e}")
+            self.logger.error("Error submitting order: %s", e)
             return {
                 'success': False,
                 'message': f'Order submission error: {str(e)}',
@@ -201,14 +265,12 @@ class RecallAPIConnector:
             Dict containing competition status and details
         """
         try:
-            if not self.connected:
-                connect_result = self.connect_to_recall()
-                if not connect_result['success']:
-                    return {
-                        'success': False,
-                        'message': 'Not connected to Recall API',
-                        'status': None
-                    }
+            if not self._ensure_connected():
+                return {
+                    'success': False,
+                    'message': 'Not connected to Recall API',
+                    'status': None
+                }
             
             if not self.config['competition_id']:
                 return {
@@ -218,15 +280,12 @@ class RecallAPIConnector:
                 }
             
             # Get competition status
-            url = f"{self.config['api_base_url']}/competitions/{self.config['competition_id']}/status"
-            headers = self._get_headers()
-            
-            response = self._make_request(url, headers=headers, method='GET')
+            response = self._make_request(self._status_url, method='GET')
             
             if response:
                 # Cache the status
-                self.competition_status_cache = response
-                self.logger.info("📊 Competition status updated")
+                self._store_cache('competition_status', response)
+                self.logger.info("%s Competition status updated", _TAG_OK)
                 
                 return {
                     'success': True,
@@ -243,7 +302,7 @@ class RecallAPIConnector:
                 }
                 
         except Exception as e:
-            self.logger.error(f"Error getting competition status: {e}")
+            self.logger.error("Error getting competition status: %s", e)
             return {
                 'success': False,
                 'message': f'Status retrieval error: {str(e)}',
@@ -262,14 +321,12 @@ class RecallAPIConnector:
             Dict containing sync status and details
         """
         try:
-            if not self.connected:
-                connect_result = self.connect_to_recall()
-                if not connect_result['success']:
-                    return {
-                        'success': False,
-                        'message': 'Not connected to Recall API',
-                        'synced': False
-                    }
+            if not self._ensure_connected():
+                return {
+                    'success': False,
+                    'message': 'Not connected to Recall API',
+                    'synced': False
+                }
             
             if not self.config['competition_id']:
                 return {
@@ -278,51 +335,28 @@ class RecallAPIConnector:
                     'synced': False
                 }
             
-            # Prepare portfolio payload
-            portfolio_payload = {
-                'competition_id': self.config['competition_id'],
-                'user_id': self.config['user_id'],
-                'total_value': portfolio_data.get('total_value', 0),
-                'cash': portfolio_data.get('cash', 0),
-                'total_pnl': portfolio_data.get('total_pnl', 0),
-                'total_pnl_percent': portfolio_data.get('total_pnl_percent', 0),
-                'positions': portfolio_data.get('positions', []),
-                'trades_count': portfolio_data.get('trades_count', 0),
-                'win_rate': portfolio_data.get('win_rate', 0),
-                'last_updated': datetime.now().isoformat(),
-                'metadata': {
-                    'source': 'expecto_patronum',
-                    'session_duration': portfolio_data.get('session_duration'),
-                    'risk_level': portfolio_data.get('risk_level', 'medium')
-                }
-            }
-            
             # Sync portfolio
-            url = f"{self.config['api_base_url']}/competitions/{self.config['competition_id']}/portfolio"
-            headers = self._get_headers()
-            
             response = self._make_request(
-                url, 
-                headers=headers, 
+                self._portfolio_url, 
                 method='PUT', 
-                data=json.dumps(portfolio_payload)
+                data=self._portfolio_body(portfolio_data)
             )
             
             if response and response.get('success'):
-                self.last_sync = datetime.now()
-                self.portfolio_cache = portfolio_data
-                self.logger.info("🔄 Portfolio synchronized with Recall API")
+                self.last_sync = _now_ms()
+                self._store_cache('portfolio', portfolio_data)
+                self.logger.info("%s Portfolio synchronized with Recall API", _TAG_SYNC)
                 
                 return {
                     'success': True,
                     'message': 'Portfolio synchronized successfully',
                     'synced': True,
-                    'timestamp': self.last_sync.isoformat(),
+                    'timestamp': _format_ms(self.last_sync),
                     'sync_details': response.get('sync_details', {})
                 }
             else:
                 error_msg = response.get('error', 'Unknown error') if response else 'No response'
-                self.logger.error(f"❌ Portfolio sync failed: {error_msg}")
+                self.logger.error("%s Portfolio sync failed: %s", _TAG_ERR, error_msg)
                 return {
                     'success': False,
                     'message': f'Portfolio sync failed: {error_msg}',
@@ -331,7 +365,7 @@ class RecallAPIConnector:
                 }
                 
         except Exception as e:
-            self.logger.error(f"Error syncing portfolio: {e}")
+            self.logger.error("Error syncing portfolio: %s", e)
             return {
                 'success': False,
                 'message': f'Portfolio sync error: {str(e)}',
@@ -339,8 +373,263 @@ class RecallAPIConnector:
                 'error': str(e)
             }
     
-    def _get_headers(self) -> Dict[str, str]:
-        """Get HTTP headers for API requests"""
+    def batch(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run several competition operations in a single request
+        
+        Falls back to one request per operation if the API does not
+        provide the batch endpoint.
+        
+        Args:
+            ops: Operations to run, each {'op': name, 'payload': data}, where
+                name is 'order' (payload: order data), 'portfolio_sync'
+                (payload: portfolio data) or 'status' (no payload)
+        
+        Returns:
+            Dict containing overall status and a list of per-operation results
+            in the same order as ops (None where an operation got no result)
+        """
+        try:
+            if not self._ensure_connected():
+                return {
+                    'success': False,
+                    'message': 'Not connected to Recall API',
+                    'results': []
+                }
+            
+            if not self.config['competition_id']:
+                return {
+                    'success': False,
+                    'message': 'Competition ID not configured',
+                    'results': []
+                }
+            
+            if not self._batch_supported:
+                return self._run_ops_individually(ops)
+            
+            # Prepare batch payload
+            batch_ops = []
+            for op in ops:
+                name = op['op']
+                if name == 'order':
+                    batch_ops.append({'op': name, 'payload': self._build_order_payload(op['payload'])})
+                elif name == 'portfolio_sync':
+                    batch_ops.append({'op': name, 'payload': self._build_portfolio_payload(op['payload'])})
+                elif name == 'status':
+                    batch_ops.append({'op': name})
+                else:
+                    raise ValueError(f'Unknown batch operation: {name}')
+            
+            # Submit batch
+            response = self._make_request(
+                self._batch_url, 
+                method='POST', 
+                data=json_dumps({'ops': batch_ops})
+            )
+            
+            # Only a missing batch endpoint is safe to replay one by one; any
+            # other failure may already have applied some of the operations
+            if response and response.get('status_code') in _BATCH_UNSUPPORTED:
+                self._batch_supported = False
+                return self._run_ops_individually(ops)
+            
+            if response and response.get('success'):
+                results = list(response.get('results') or ())[:len(ops)]
+                results += [None] * (len(ops) - len(results))
+                for op, sub_response in zip(ops, results):
+                    if not sub_response or not sub_response.get('success', True):
+                        continue
+                    if op['op'] == 'status':
+                        self._store_cache('competition_status', sub_response)
+                    elif op['op'] == 'portfolio_sync':
+                        self.last_sync = _now_ms()
+                        self._store_cache('portfolio', op['payload'])
+                
+                self.logger.info("%s Batch of %d operations submitted", _TAG_OK, len(ops))
+                return {
+                    'success': True,
+                    'message': 'Batch submitted successfully',
+                    'results': results,
+                    'timestamp': datetime.now().isoformat()
+                }
+            else:
+                error_msg = response.get('error', 'Unknown error') if response else 'No response'
+                self.logger.error("%s Batch submission failed: %s", _TAG_ERR, error_msg)
+                return {
+                    'success': False,
+                    'message': f'Batch submission failed: {error_msg}',
+                    'results': [],
+                    'error': error_msg
+                }
+                
+        except Exception as e:
+            self.logger.error("Error submitting batch: %s", e)
+            return {
+                'success': False,
+                'message': f'Batch submission error: {str(e)}',
+                'results': [],
+                'error': str(e)
+            }
+    
+    # Async twins - each call runs on a worker thread over the shared pool, so
+    # an event loop can fan out several API calls with asyncio.gather
+    
+    async def connect_async(self) -> Dict[str, Any]:
+        """Async version of connect_to_recall"""
+        return await asyncio.to_thread(self.connect_to_recall)
+    
+    async def submit_order_async(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of submit_order_to_competition"""
+        return await asyncio.to_thread(self.submit_order_to_competition, order_data)
+    
+    async def get_competition_status_async(self) -> Dict[str, Any]:
+        """Async version of get_competition_status"""
+        return await asyncio.to_thread(self.get_competition_status)
+    
+    async def sync_portfolio_async(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of sync_portfolio_with_api"""
+        return await asyncio.to_thread(self.sync_portfolio_with_api, portfolio_data)
+    
+    async def batch_async(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Async version of batch"""
+        return await asyncio.to_thread(self.batch, ops)
+    
+    def queue_op(self, op: str, payload: Optional[Dict[str, Any]] = None):
+        """
+        Queue an operation to be sent with the next auto-sync batch
+        
+        Args:
+            op: Operation name ('order', 'portfolio_sync' or 'status')
+            payload: Order or portfolio data for the operation
+        """
+        if op not in BATCH_OPS:
+            raise ValueError(f'Unknown batch operation: {op}')
+        
+        with self._pending_lock:
+            self._pending_ops.append({'op': op, 'payload': payload, 'attempts': 0})
+    
+    def _drain_pending_ops(self) -> List[Dict[str, Any]]:
+        """Take all queued operations, coalescing portfolio syncs and status polls"""
+        with self._pending_lock:
+            pending = list(self._pending_ops)
+            self._pending_ops.clear()
+        
+        # Every order is sent; only the newest portfolio snapshot matters, and
+        # the auto-sync tick always adds its own status poll
+        ops = [op for op in pending if op['op'] == 'order']
+        syncs = [op for op in pending if op['op'] == 'portfolio_sync']
+        if syncs:
+            ops.append(syncs[-1])
+        return ops
+    
+    def _requeue_failed_ops(self, ops: List[Dict[str, Any]], results: List[Optional[Dict[str, Any]]]):
+        """Put failed portfolio syncs back on the queue, up to MAX_OP_ATTEMPTS sends"""
+        retry = []
+        for index, op in enumerate(ops):
+            result = results[index] if index < len(results) else None
+            if result and result.get('success', True):
+                continue
+            if op['op'] == 'order':
+                # A failed send may still have reached the API; resending could fill twice
+                self.logger.warning("%s Not resending failed order for %s", _TAG_SYNC,
+                                    (op['payload'] or {}).get('symbol'))
+                continue
+            attempts = op.get('attempts', 0) + 1
+            if attempts >= MAX_OP_ATTEMPTS:
+                self.logger.warning("%s Dropping %s operation after %d failed attempts", _TAG_SYNC, op['op'], attempts)
+                continue
+            retry.append({**op, 'attempts': attempts})
+        
+        if retry:
+            with self._pending_lock:
+                self._pending_ops.extendleft(reversed(retry))
+    
+    def _run_ops_individually(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run batch operations as separate requests"""
+        handlers = {
+            'order': lambda op: self.submit_order_to_competition(op['payload']),
+            'portfolio_sync': lambda op: self.sync_portfolio_with_api(op['payload']),
+            'status': lambda op: self.get_competition_status()
+        }
+        
+        results = [handlers[op['op']](op) for op in ops]
+        return {
+            'success': all(result['success'] for result in results),
+            'message': 'Batch endpoint unavailable, operations sent individually',
+            'results': results,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _build_order_payload(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the API payload for an order"""
+        return {**self._identity, **self._order_fields(order_data)}
+    
+    def _order_body(self, order_data: Dict[str, Any]) -> bytes:
+        """Serialize an order payload behind the pre-encoded identity prefix"""
+        return self._identity_prefix + json_dumps(self._order_fields(order_data))[1:]
+    
+    def _order_fields(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-order part of the order payload"""
+        return {
+            'symbol': order_data.get('symbol'),
+            'amount': order_data.get('amount'),
+            'order_type': order_data.get('type', 'MARKET'),  # MARKET, LIMIT, etc.
+            'side': order_data.get('side', 'BUY'),  # BUY, SELL
+            'timestamp': _now_ms(),  # unix ms
+            'metadata': {
+                'source': 'expecto_patronum',
+                'spell_cast': order_data.get('spell', 'UNKNOWN'),
+                'portfolio_value': order_data.get('portfolio_value'),
+                'risk_score': order_data.get('risk_score', 0.0)
+            }
+        }
+    
+    def _build_portfolio_payload(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the API payload for a portfolio sync"""
+        return {**self._identity, **self._portfolio_fields(portfolio_data)}
+    
+    def _portfolio_body(self, portfolio_data: Dict[str, Any]) -> bytes:
+        """Serialize a portfolio payload behind the pre-encoded identity prefix"""
+        return self._identity_prefix + json_dumps(self._portfolio_fields(portfolio_data))[1:]
+    
+    def _portfolio_fields(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-sync part of the portfolio payload"""
+        return {
+            'total_value': portfolio_data.get('total_value', 0),
+            'cash': portfolio_data.get('cash', 0),
+            'total_pnl': portfolio_data.get('total_pnl', 0),
+            'total_pnl_percent': portfolio_data.get('total_pnl_percent', 0),
+            'positions': portfolio_data.get('positions', []),
+            'trades_count': portfolio_data.get('trades_count', 0),
+            'win_rate': portfolio_data.get('win_rate', 0),
+            'last_updated': _now_ms(),  # unix ms
+            'metadata': {
+                'source': 'expecto_patronum',
+                'session_duration': portfolio_data.get('session_duration'),
+                'risk_level': portfolio_data.get('risk_level', 'medium')
+            }
+        }
+    
+    @property
+    def portfolio_cache(self) -> Mapping[str, Any]:
+        """Last portfolio successfully synced with the API (read-only)"""
+        return self._caches['portfolio']
+    
+    @property
+    def competition_status_cache(self) -> Mapping[str, Any]:
+        """Last competition status received from the API (read-only)"""
+        return self._caches['competition_status']
+    
+    def _store_cache(self, name: str, value: Dict[str, Any]):
+        """Publish a new cache entry by rebinding a fresh snapshot"""
+        entry = MappingProxyType(dict(value))
+        with self._cache_lock:
+            caches = dict(self._caches)
+            caches[name] = entry
+            self._caches = MappingProxyType(caches)
+    
+    def _rebuild_cached(self):
+        """Precompute request headers and endpoint URLs from the current config"""
         headers = {
             'Content-Type': 'application/json',
             'User-Agent': 'ExpectoPatronum/1.0'
@@ -349,40 +638,65 @@ class RecallAPIConnector:
         if self.config['api_key']:
             headers['Authorization'] = f'Bearer {self.config["api_key"]}'
         
-        return headers
+        base_url = self.config['api_base_url']
+        competition_url = f"{base_url}/competitions/{self.config['competition_id']}"
+        
+        # competition_id/user_id lead every order and portfolio payload - keep
+        # them encoded once as an open JSON object ready for the per-call fields
+        self._identity = {
+            'competition_id': self.config['competition_id'],
+            'user_id': self.config['user_id']
+        }
+        self._identity_prefix = json_dumps(self._identity)[:-1] + b','
+        
+        self._headers = headers
+        self._health_url = f"{base_url}/health"
+        self._orders_url = f"{competition_url}/orders"
+        self._status_url = f"{competition_url}/status"
+        self._portfolio_url = f"{competition_url}/portfolio"
+        self._batch_url = f"{competition_url}/batch"
     
-    def _make_request(self, url: str, headers: Dict[str, str], 
-                     method: str = 'GET', data: str = None) -> Optional[Dict]:
-        """Make HTTP request with retry logic"""
+    @classmethod
+    def configure_pool(cls, maxsize: int):
+        """Set how many idle keep-alive connections the shared session keeps per host"""
+        _mount_pool(maxsize)
+    
+    def _make_request(self, url: str, method: str = 'GET', data: Optional[bytes] = None,
+                     headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Make HTTP request with retry logic (uses the cached API headers by default)"""
+        if headers is None:
+            headers = self._headers
+        body = data.encode('utf-8') if isinstance(data, str) else data
+        
         for attempt in range(self.config['retry_attempts']):
             try:
-                req = urllib.request.Request(url, headers=headers, method=method)
+                response = self._http.request(
+                    method, url, data=body, headers=headers, timeout=self.config['timeout']
+                )
+                status, reason = response.status_code, response.reason
                 
-                if data:
-                    req.data = data.encode('utf-8')
+                if status < 400:
+                    return json_loads(response.content)
                 
-                with urllib.request.urlopen(req, timeout=self.config['timeout']) as response:
-                    response_data = response.read()
-                    return json.loads(response_data.decode('utf-8'))
+                self.logger.warning("HTTP error (attempt %d): %s - %s", attempt + 1, status, reason)
+                if (attempt == self.config['retry_attempts'] - 1
+                        or (status < 500 and status not in _RETRYABLE_CLIENT_ERRORS)):
+                    return {'success': False, 'error': f'HTTP {status}: {reason}', 'status_code': status}
                     
-            except urllib.error.HTTPError as e:
-                self.logger.warning(f"HTTP error (attempt {attempt + 1}): {e.code} - {e.reason}")
+            except requests.RequestException as e:
+                # Connection refused, DNS failure, timeout, truncated body, ...
+                self.logger.warning("URL error (attempt %d): %s", attempt + 1, e)
                 if attempt == self.config['retry_attempts'] - 1:
-                    return {'success': False, 'error': f'HTTP {e.code}: {e.reason}'}
-                    
-            except urllib.error.URLError as e:
-                self.logger.warning(f"URL error (attempt {attempt + 1}): {e.reason}")
-                if attempt == self.config['retry_attempts'] - 1:
-                    return {'success': False, 'error': f'URL error: {e.reason}'}
+                    return {'success': False, 'error': f'URL error: {e}'}
                     
             except Exception as e:
-                self.logger.warning(f"Request error (attempt {attempt + 1}): {e}")
+                self.logger.warning("Request error (attempt %d): %s", attempt + 1, e)
                 if attempt == self.config['retry_attempts'] - 1:
                     return {'success': False, 'error': str(e)}
             
-            # Wait before retry
+            # Wait before retry, backing off exponentially
             if attempt < self.config['retry_attempts'] - 1:
-                time.sleep(self.config['retry_delay'])
+                time.sleep(_backoff(attempt, self.config['retry_delay']))
         
         return None
     
@@ -392,32 +706,41 @@ class RecallAPIConnector:
             return
         
         self.running = True
+        self._stop_evt.clear()
         self.sync_thread = threading.Thread(target=self._auto_sync_loop, daemon=True)
         self.sync_thread.start()
-        self.logger.info("🔄 Auto-sync started")
+        self.logger.info("%s Auto-sync started", _TAG_SYNC)
     
     def stop_auto_sync(self):
         """Stop automatic portfolio synchronization"""
         self.running = False
+        self._stop_evt.set()
         if self.sync_thread and self.sync_thread.is_alive():
             self.sync_thread.join(timeout=5)
-        self.logger.info("🛑 Auto-sync stopped")
+        self.logger.info("%s Auto-sync stopped", _TAG_SYNC)
     
     def _auto_sync_loop(self):
         """Background loop for automatic synchronization"""
         while self.running:
             try:
-                # Get competition status
-                self.get_competition_status()
-                time.sleep(self.config['sync_interval'])
+                # Flush queued operations together with the status poll
+                ops = self._drain_pending_ops()
+                result = self.batch(ops + [{'op': 'status'}])
+                self._requeue_failed_ops(ops, result['results'])
             except Exception as e:
-                self.logger.error(f"Auto-sync error: {e}")
-                time.sleep(self.config['sync_interval'])
+                self.logger.error("Auto-sync error: %s", e)
+            
+            if self._stop_evt.wait(self.config['sync_interval']):
+                return
     
     def update_config(self, new_config: Dict[str, Any]):
         """Update configuration settings"""
         self.config.update(new_config)
-        self.logger.info("⚙️ Configuration updated")
+        self._rebuild_cached()
+        self.logger.info("%s Configuration updated", _TAG_CONFIG)
+        
+        if 'api_base_url' in new_config:
+            self._batch_supported = True
         
         # Reconnect if API key changed
         if 'api_key' in new_config:
@@ -428,7 +751,7 @@ class RecallAPIConnector:
         """Get current connection status"""
         return {
             'connected': self.connected,
-            'last_sync': self.last_sync.isoformat() if self.last_sync else None,
+            'last_sync': _format_ms(self.last_sync) if self.last_sync else None,
             'auto_sync_running': self.running,
             'competition_id': self.config['competition_id'],
             'api_base_url': self.config['api_base_url']
@@ -438,4 +761,4 @@ class RecallAPIConnector:
         """Disconnect from Recall API"""
         self.stop_auto_sync()
         self.connected = False
-        self.logger.info("🔌 Disconnected from Recall API")
\ No newline at end of file
+        self.logger.info("%s Disconnected from Recall API", _TAG_CONN)
\ No newline at end of file
@@ -2,8 +2,89 @@
 Risk Management - Magical protection spells for trading
 """
 
-from typing import Dict, List
+from array import array
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 import logging
+import math
+import sys
+
+from .jit import jit
+
+# Reason codes carried in check results as 'code'
+REASON_OK = 0
+REASON_AMOUNT = 1
+REASON_VALUE = 2
+REASON_LEVERAGE = 3
+REASON_POSITION_SIZE = 4
+REASON_EXPOSURE = 5
+REASON_DAILY_LOSS = 6
+REASON_BAD_INPUT = 7
+
+_REASON_TEMPLATES = {
+    REASON_AMOUNT: 'Amount {} exceeds limit of {} for {}',
+    REASON_VALUE: 'Position value ${:,.2f} exceeds limit of ${:,.2f} for {}',
+    REASON_LEVERAGE: 'Leverage {:.1f}x exceeds maximum of {}x',
+    REASON_POSITION_SIZE: 'Position size {:.1%} exceeds limit of {:.1%}',
+    REASON_EXPOSURE: 'Total exposure {:.1%} exceeds limit of {:.1%}',
+    REASON_DAILY_LOSS: 'Daily loss limit would be exceeded. Current: ${:,.2f}, New: ${:,.2f}',
+    REASON_BAD_INPUT: 'Invalid {}: {}'
+}
+
+# Lowercased, interned symbol keys - checks see the same few symbols over and over
+_LOWER_CACHE: Dict[str, str] = {}
+_LOWER_CACHE_SIZE = 4096
+
+def _low(symbol: str) -> str:
+    """Return the interned lowercase form of a symbol"""
+    key = _LOWER_CACHE.get(symbol)
+    if key is None:
+        if len(_LOWER_CACHE) >= _LOWER_CACHE_SIZE:
+            _LOWER_CACHE.popitem()
+        key = _LOWER_CACHE[symbol] = sys.intern(symbol.lower())
+    return key
+
+def reason_for_code(code: int, *args) -> str:
+    """Format the human-readable reason for a REASON_* code"""
+    return _REASON_TEMPLATES[code].format(*args)
+
+def _blocked(code: int, *args) -> Dict:
+    """Build a failed check result"""
+    return {'allowed': False, 'reason': reason_for_code(code, *args), 'code': code}
+
+@jit
+def _check_position_kernel(amount: float, price: float, max_amount: float, max_value: float,
+                           is_short: bool, max_leverage: float) -> int:
+    """Numeric core of check_position_limit, returning a REASON_* code"""
+    if amount > max_amount:
+        return REASON_AMOUNT
+    position_value = amount * price
+    if position_value > max_value:
+        return REASON_VALUE
+    if is_short and position_value / (position_value * SHORT_MARGIN) > max_leverage:
+        return REASON_LEVERAGE
+    return REASON_OK
+
+@jit
+def _check_portfolio_kernel(portfolio_value: float, new_position_value: float, current_exposure: float,
+                            max_position_size: float, max_total_exposure: float) -> int:
+    """Numeric core of check_portfolio_risk, returning a REASON_* code"""
+    if new_position_value / portfolio_value > max_position_size:
+        return REASON_POSITION_SIZE
+    if (current_exposure + new_position_value) / portfolio_value > max_total_exposure:
+        return REASON_EXPOSURE
+    return REASON_OK
+
+# Shared read-only results for passing checks - nothing is allocated on success
+_POSITION_OK = MappingProxyType({'allowed': True, 'reason': 'Position meets risk management requirements', 'code': REASON_OK})
+_PORTFOLIO_OK = MappingProxyType({'allowed': True, 'reason': 'Portfolio risk checks passed', 'code': REASON_OK})
+_DAILY_LOSS_OK = MappingProxyType({'allowed': True, 'reason': 'Daily loss limit check passed', 'code': REASON_OK})
+
+SHORT_MARGIN = 0.1  # 10% margin on short positions
+DEFAULT_PORTFOLIO_VALUE = 10000.0  # Matches the portfolio's starting cash
+
+# Scalar limits that must stay finite and positive
+_SCALAR_LIMITS = ('max_position_size', 'max_total_exposure', 'max_daily_loss', 'max_leverage')
 
 class RiskManager:
     """Magical risk manager that protects against dangerous trading spells"""
@@ -18,6 +99,8 @@ class RiskManager:
         # Daily tracking
         self.daily_pnl = 0.0
         self.daily_trades = []
+        self._daily_base_value = DEFAULT_PORTFOLIO_VALUE
+        self._daily_loss_floor = -self._daily_base_value * self.max_daily_loss
         
         # Position limits per symbol
         self.symbol_limits = {
@@ -30,11 +113,18 @@ class RiskManager:
         
         # Default limits for unknown symbols
         self.default_limits = {'max_amount': 100.0, 'max_value': 10000}
+        self._rebuild_symbol_limits()
         
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
-    def check_position_limit(self, symbol: str, position_type: str, amount: float, price: float) -> Dict:
+    def _rebuild_symbol_limits(self):
+        """Flatten symbol_limits/default_limits into per-field lookup tables"""
+        self._max_amount = {_low(k): v['max_amount'] for k, v in self.symbol_limits.items()}
+        self._max_value = {_low(k): v['max_value'] for k, v in self.symbol_limits.items()}
+        self._default_max_amount = self.default_limits['max_amount']
+        self._default_max_value = self.default_limits['max_value']
+    
+    def check_position_limit(self, symbol: str, position_type: str, amount: float, price: float) -> Mapping:
         """
         Check if a position meets risk management requirements
         
@@ -45,51 +135,69 @@ class RiskManager:
             price: Current price
         
         Returns:
-            Dict with allowed status and reason
+            Mapping with allowed status, reason and REASON_* code (read-only when allowed)
         """
-        try:
-            # Get symbol-specific limits
-            limits = self.symbol_limits.get(symbol.lower(), self.default_limits)
-            
-            # Check amount limit
-            if amount > limits['max_amount']:
-                return {
-                    'allowed': False,
-                    'reason': f'Amount {amount} exceeds limit of {limits["max_amount"]} for {symbol}'
-                }
-            
-            # Check value limit
-            position_value = amount * price
-            if position_value > limits['max_value']:
-                return {
-                    'allowed': False,
-                    'reason': f'Position value ${position_value:,.2f} exceeds limit of ${limits["max_value"]:,.2f} for {symbol}'
-                }
-            
-            # Check leverage for short positions
-            if position_type == 'SHORT':
-                leverage = position_value / (position_value * 0.1)  # 10% margin
-                if leverage > self.max_leverage:
-                    return {
-                        'allowed': False,
-                        'reason': f'Leverage {leverage:.1f}x exceeds maximum of {self.max_leverage}x'
-                    }
-            
-            # All checks passed
-            return {
-                'allowed': True,
-                'reason': 'Position meets risk management requirements'
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error checking position limit: {e}")
-            return {
-                'allowed': False,
-                'reason': f'Risk check error: {str(e)}'
-            }
+        # Reject bad input up front (also catches NaN) so the arithmetic below cannot fail
+        if not amount > 0:
+            return _blocked(REASON_BAD_INPUT, 'amount', amount)
+        if not price > 0:
+            return _blocked(REASON_BAD_INPUT, 'price', price)
+        
+        # Get symbol-specific limits
+        key = _low(symbol)
+        max_amount = self._max_amount.get(key, self._default_max_amount)
+        max_value = self._max_value.get(key, self._default_max_value)
+        
+        code = _check_position_kernel(amount, price, max_amount, max_value,
+                                      position_type == 'SHORT', self.max_leverage)
+        if code == REASON_OK:
+            return _POSITION_OK
+        
+        # Only failures pay for building the reason
+        if code == REASON_AMOUNT:
+            return _blocked(code, amount, max_amount, symbol)
+        if code == REASON_VALUE:
+            return _blocked(code, amount * price, max_value, symbol)
+        return _blocked(code, 1.0 / SHORT_MARGIN, self.max_leverage)
+    
+    def check_positions_batch(self, symbols: Sequence[str], position_types: Sequence[str],
+                              amounts: Sequence[float], prices: Sequence[float]) -> Tuple[List[bool], array]:
+        """
+        Run check_position_limit over many orders at once
+        
+        Args:
+            symbols: Cryptocurrency symbols
+            position_types: LONG or SHORT per order
+            amounts: Amounts to trade
+            prices: Current prices
+        
+        Returns:
+            Tuple of (allowed flags, REASON_* codes as array('b'))
+        """
+        max_amount = self._max_amount
+        max_value = self._max_value
+        default_amount = self._default_max_amount
+        default_value = self._default_max_value
+        short_blocked = 1.0 / SHORT_MARGIN > self.max_leverage
+        
+        codes = array('b')
+        for symbol, position_type, amount, price in zip(symbols, position_types, amounts, prices):
+            key = _low(symbol)
+            if not (amount > 0 and price > 0):
+                codes.append(REASON_BAD_INPUT)
+            elif amount > max_amount.get(key, default_amount):
+                codes.append(REASON_AMOUNT)
+            elif amount * price > max_value.get(key, default_value):
+                codes.append(REASON_VALUE)
+            elif short_blocked and position_type == 'SHORT':
+                codes.append(REASON_LEVERAGE)
+            else:
+                codes.append(REASON_OK)
+        
+        return [code == REASON_OK for code in codes], codes
     
     def check_portfolio_risk(self, portfolio_value: float, new_position_value: float, 
-                           current_exposure: float) -> Dict:
+                           current_exposure: float) -> Mapping:
         """
         Check portfolio-level risk management
         
@@ -99,77 +207,54 @@ class RiskManager:
             current_exposure: Current total exposure
         
         Returns:
-            Dict with allowed status and reason
+            Mapping with allowed status, reason and REASON_* code (read-only when allowed)
         """
-        try:
-            # Check position size limit
-            position_size_ratio = new_position_value / portfolio_value
-            if position_size_ratio > self.max_position_size:
-                return {
-                    'allowed': False,
-                    'reason': f'Position size {position_size_ratio:.1%} exceeds limit of {self.max_position_size:.1%}'
-                }
-            
-            # Check total exposure limit
-            total_exposure_ratio = (current_exposure + new_position_value) / portfolio_value
-            if total_exposure_ratio > self.max_total_exposure:
-                return {
-                    'allowed': False,
-                    'reason': f'Total exposure {total_exposure_ratio:.1%} exceeds limit of {self.max_total_exposure:.1%}'
-                }
-            
-            return {
-                'allowed': True,
-                'reason': 'Portfolio risk checks passed'
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error checking portfolio risk: {e}")
-            return {
-                'allowed': False,
-                'reason': f'Portfolio risk check error: {str(e)}'
-            }
+        if not portfolio_value > 0:
+            return _blocked(REASON_BAD_INPUT, 'portfolio value', portfolio_value)
+        
+        code = _check_portfolio_kernel(portfolio_value, new_position_value, current_exposure,
+                                       self.max_position_size, self.max_total_exposure)
+        if code == REASON_OK:
+            return _PORTFOLIO_OK
+        
+        if code == REASON_POSITION_SIZE:
+            return _blocked(code, new_position_value / portfolio_value, self.max_position_size)
+        return _blocked(code, (current_exposure + new_position_value) / portfolio_value,
+                        self.max_total_exposure)
     
-    def check_daily_loss_limit(self, new_pnl: float) -> Dict:
+    def check_daily_loss_limit(self, new_pnl: float) -> Mapping:
         """
         Check if new P&L would exceed daily loss limit
         
+        The limit is an absolute floor of -(portfolio value * max_daily_loss),
+        fixed when daily tracking is reset.
+        
         Args:
             new_pnl: New P&L to add to daily total
         
         Returns:
-            Dict with allowed status and reason
+            Mapping with allowed status, reason and REASON_* code (read-only when allowed)
         """
-        try:
-            # Calculate new daily P&L
-            new_daily_pnl = self.daily_pnl + new_pnl
-            
-            # Check if it would exceed loss limit
-            if new_daily_pnl < -(self.daily_pnl * self.max_daily_loss):
-                return {
-                    'allowed': False,
-                    'reason': f'Daily loss limit would be exceeded. Current: ${self.daily_pnl:,.2f}, New: ${new_daily_pnl:,.2f}'
-                }
-            
-            return {
-                'allowed': True,
-                'reason': 'Daily loss limit check passed'
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error checking daily loss limit: {e}")
-            return {
-                'allowed': False,
-                'reason': f'Daily loss check error: {str(e)}'
-            }
+        new_daily_pnl = self.daily_pnl + new_pnl
+        if new_daily_pnl >= self._daily_loss_floor:
+            return _DAILY_LOSS_OK
+        
+        return _blocked(REASON_DAILY_LOSS, self.daily_pnl, new_daily_pnl)
     
     def update_daily_pnl(self, pnl: float):
         """Update daily P&L tracking"""
+        if not math.isfinite(pnl):
+            self.logger.warning("Ignoring non-finite daily P&L update: %s", pnl)
+            return
+        
         self.daily_pnl += pnl
-        self.logger.info(f"Updated daily P&L: ${self.daily_pnl:,.2f}")
+        self.logger.info("Updated daily P&L: $%.2f", self.daily_pnl)
     
-    def reset_daily_tracking(self):
-        """Reset daily tracking (call at start of new day)"""
+    def reset_daily_tracking(self, portfolio_value: Optional[float] = None):
+        """Reset daily tracking (call at start of new day with the opening portfolio value)"""
+        if portfolio_value is not None:
+            self._daily_base_value = portfolio_value
+        self._daily_loss_floor = -self._daily_base_value * self.max_daily_loss
         self.daily_pnl = 0.0
         self.daily_trades = []
         self.logger.info("Daily risk tracking reset")
@@ -188,9 +273,17 @@ class RiskManager:
     def set_risk_limits(self, **kwargs):
         """Update risk management limits"""
         for key, value in kwargs.items():
+            if key in _SCALAR_LIMITS and not (isinstance(value, (int, float)) and math.isfinite(value) and value > 0):
+                self.logger.warning("Ignoring invalid risk limit: %s = %s", key, value)
+                continue
             if hasattr(self, key):
                 setattr(self, key, value)
-                self.logger.info(f"Updated risk limit: {key} = {value}")
+                self.logger.info("Updated risk limit: %s = %s", key, value)
+        
+        if 'symbol_limits' in kwargs or 'default_limits' in kwargs:
+            self._rebuild_symbol_limits()
+        if 'max_daily_loss' in kwargs:
+            self._daily_loss_floor = -self._daily_base_value * self.max_daily_loss
     
     def get_risk_report(self) -> Dict:
         """Generate a comprehensive risk report"""
@@ -199,7 +292,7 @@ class RiskManager:
             'daily_stats': {
                 'daily_pnl': self.daily_pnl,
                 'daily_trades': len(self.daily_trades),
-                'loss_limit_remaining': self.daily_pnl * self.max_daily_loss
+                'loss_limit_remaining': self.daily_pnl - self._daily_loss_floor
             },
             'symbol_limits': self.symbol_limits
         }
\ No newline at end of file
@@ -3,36 +3,123 @@ Trading Engine - The magical core of Expecto Patronum
 Handles all trading operations with Harry Potter spell names
 """
 
+import functools
 import time
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 import logging
 
+import requests
+from requests.adapters import HTTPAdapter
+
+from .jit import jit
+
+logger = logging.getLogger(__name__)
+
+class Spell(IntEnum):
+    """Trading spells, numbered by their slot in TradingEngine._handlers"""
+    EXPECTO_LONG = 0
+    EXPECTO_SHORT = 1
+    FINITE_INCANTATEM = 2
+    ALOHOMORA = 3  # Open position
+    COLLOPORTUS = 4  # Close position
+    LUMOS = 5  # Light up portfolio
+    NOX = 6  # Darken portfolio
+
+# Spell names -> Spell (keyed by str only, so plain ints and bools never match)
+_SPELL_LOOKUP = {spell.name: spell for spell in Spell}
+
+# Trade log action for closing each position type
+_CLOSE_ACTIONS = {'LONG': 'CLOSE_LONG', 'SHORT': 'CLOSE_SHORT'}
+
+# Spell result messages - formatted only on the path that returns them
+_NOT_ACTIVE_MESSAGE = '❌ Trading engine is not active. Cast Lumos to activate!'
+_MSG_UNKNOWN_SPELL = '❌ Unknown spell: {spell}. Check your spell book!'
+_MSG_NO_PRICE = '❌ Cannot get price for {symbol}. Market data unavailable.'
+_MSG_SPELL_BACKFIRED = '❌ {label} backfired: {error}'
+_MSG_RISK_BLOCKED = '🛡️ Risk management blocked: {reason}'
+_MSG_OPEN_OK = '🦌 {label} cast successfully! Opened {amount} {symbol} at ${price:,.2f}'
+_MSG_SPELL_FAILED = '❌ {label} failed: {reason}'
+_MSG_CLOSE_OK = '🛡️ Finite Incantatem cast! Closed {amount} {symbol} positions'
+_MSG_LUMOS = '✨ Lumos! Trading engine activated and portfolio illuminated!'
+_MSG_NOX = '🌙 Nox! Trading engine deactivated and portfolio darkened.'
+
+@jit
+def _portfolio_metrics(winning: int, total: int, pnl: float, base: float) -> Tuple[float, float]:
+    """Return (win rate %, P&L %) for the Recall portfolio sync"""
+    win_rate = winning / max(1, total) * 100.0
+    pnl_percent = pnl / base * 100.0 if base > 0 else 0.0
+    return win_rate, pnl_percent
+
+def _spell(spell: str, label: str) -> Callable[[Callable[..., Dict]], Callable[..., Dict]]:
+    """Turn any exception raised by a spell into its 'backfired' result"""
+    def decorator(func: Callable[..., Dict]) -> Callable[..., Dict]:
+        @functools.wraps(func)
+        def wrapper(self: 'TradingEngine', *args: Any, **kwargs: Any) -> Dict:
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                return {
+                    'success': False,
+                    'message': _MSG_SPELL_BACKFIRED.format(label=label, error=e),
+                    'spell': spell
+                }
+        return wrapper
+    return decorator
+
+def _format_duration(seconds: float) -> str:
+    """Format elapsed seconds as H:MM:SS"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
 class TradingEngine:
     """Magical trading engine that executes trades using Harry Potter spells"""
     
-    def __init__(self, market_data, portfolio, risk_manager, db_manager, recall_connector=None):
+    __slots__ = (
+        'market_data', 'portfolio', 'risk_manager', 'db_manager', 'recall_connector',
+        '_running', 'lock', '_io_pool', '_handlers', 'spells', '_spell_names',
+        '_stats_lock', 'session_stats', '_start_monotonic', 'logger', '_aloho', '_synced_version',
+        '_trading_day'
+    )
+    
+    def __init__(self, market_data: Any, portfolio: Any, risk_manager: Any, db_manager: Any,
+                 recall_connector: Any = None) -> None:
         self.market_data = market_data
         self.portfolio = portfolio
         self.risk_manager = risk_manager
         self.db_manager = db_manager
         self.recall_connector = recall_connector  # Recall API connector
-        self.running = False
-        self.lock = threading.Lock()
+        self._running = threading.Event()  # Set while the engine accepts spells
+        self.lock = threading.Lock()  # Serializes start/stop transitions
+        self._io_pool = None  # Worker threads for Recall calls, created on first use
+        self._synced_version = None  # portfolio.version last synced to Recall
+        self._trading_day = None  # Day the daily loss tracking was last reset for
+        
+        # Spell handlers, indexed by Spell
+        self._handlers = (
+            self._cast_expecto_long,
+            self._cast_expecto_short,
+            self._cast_finite_incantatem,
+            self._cast_alohomora,
+            self._cast_finite_incantatem,  # Colloportus closes exactly like Finite Incantatem
+            self._cast_lumos,
+            self._cast_nox
+        )
         
         # Trading spells mapping
-        self.spells = {
-            'EXPECTO_LONG': self._cast_expecto_long,
-            'EXPECTO_SHORT': self._cast_expecto_short,
-            'FINITE_INCANTATEM': self._cast_finite_incantatem,
-            'ALOHOMORA': self._cast_alohomora,  # Open position
-            'COLLOPORTUS': self._cast_colloportus,  # Close position
-            'LUMOS': self._cast_lumos,  # Light up portfolio
-            'NOX': self._cast_nox  # Darken portfolio
-        }
+        self.spells = {spell.name: self._handlers[spell] for spell in Spell}
+        self._spell_names = tuple(self.spells)
         
-        # Trading session stats
+        # Alohomora position type -> opening spell (anything but LONG opens a short)
+        self._aloho = {'LONG': self._cast_expecto_long, 'SHORT': self._cast_expecto_short}
+        
+        # Trading session stats - counters are only touched under _stats_lock so
+        # concurrent casts never lose an update (no GIL on free-threaded builds)
+        self._stats_lock = threading.Lock()
         self.session_stats = {
             'total_trades': 0,
             'successful_trades': 0,
@@ -40,34 +127,48 @@ class TradingEngine:
             'total_pnl': 0.0,
             'start_time': datetime.now()
         }
+        self._start_monotonic = time.monotonic()  # Wall-clock jumps do not skew the duration
         
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
+        if recall_connector is not None:
+            self._check_recall_connector(recall_connector)
+    
+    @property
+    def running(self) -> bool:
+        """Whether the engine is active and accepting spells"""
+        return self._running.is_set()
     
-    def start(self):
+    def start(self) -> bool:
         """Start the magical trading engine"""
         with self.lock:
-            if not self.running:
-                self.running = True
+            if not self._running.is_set():
+                self._running.set()
                 self.logger.info("🦌 Expecto Patronum trading engine activated!")
                 return True
         return False
     
-    def stop(self):
+    def stop(self) -> bool:
         """Stop the magical trading engine"""
         with self.lock:
-            if self.running:
-                self.running = False
+            io_pool, self._io_pool = self._io_pool, None
+            if io_pool is not None:
+                io_pool.shutdown(wait=False)  # Already queued Recall calls still finish
+            if self._running.is_set():
+                self._running.clear()
                 self.logger.info("🛡️ Trading engine deactivated")
                 return True
         return False
     
-    def cast_spell(self, spell_name: str, symbol: str, amount: float, **kwargs) -> Dict:
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first market data update lands; False on timeout"""
+        return self.market_data.ready_event.wait(timeout)
+    
+    def cast_spell(self, spell_name: Union[str, Spell], symbol: str, amount: float, **kwargs) -> Dict:
         """
         Cast a trading spell to execute trades
         
         Args:
-            spell_name: The magical spell to cast
+            spell_name: The magical spell to cast (name or Spell member)
             symbol: Cryptocurrency symbol (e.g., 'bitcoin')
             amount: Amount to trade
             **kwargs: Additional spell parameters
@@ -75,19 +176,26 @@ class TradingEngine:
         Returns:
             Dict containing spell result
         """
-        if not self.running:
+        if not self._running.is_set():
             return {
                 'success': False,
-                'message': '❌ Trading engine is not active. Cast Lumos to activate!',
+                'message': _NOT_ACTIVE_MESSAGE,
                 'spell': spell_name
             }
         
-        if spell_name not in self.spells:
+        if isinstance(spell_name, Spell):
+            spell = spell_name
+        elif isinstance(spell_name, str):
+            spell = _SPELL_LOOKUP.get(spell_name)
+        else:
+            spell = None
+        if spell is None:
             return {
                 'success': False,
-                'message': f'❌ Unknown spell: {spell_name}. Check your spell book!',
+                'message': _MSG_UNKNOWN_SPELL.format(spell=spell_name),
                 'spell': spell_name
             }
+        handler = self._handlers[spell]
         
         try:
             # Get current price
@@ -95,180 +203,190 @@ class TradingEngine:
             if not current_price:
                 return {
                     'success': False,
-                    'message': f'❌ Cannot get price for {symbol}. Market data unavailable.',
+                    'message': _MSG_NO_PRICE.format(symbol=symbol),
                     'spell': spell_name
                 }
             
-            # Execute the spell
-            result = self.spells[spell_name](symbol, amount, current_price, **kwargs)
+            # Execute the spell - one timestamp for every record this cast writes
+            timestamp = kwargs.setdefault('timestamp', datetime.now())
+            self._roll_trading_day(timestamp)
+            result = handler(symbol, amount, current_price, **kwargs)
             
             # Update session stats
-            self.session_stats['total_trades'] += 1
-            if result['success']:
-                self.session_stats['successful_trades'] += 1
-            else:
-                self.session_stats['failed_trades'] += 1
+            stats = self.session_stats
+            outcome = 'successful_trades' if result['success'] else 'failed_trades'
+            with self._stats_lock:
+                stats['total_trades'] += 1
+                stats[outcome] += 1
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Error casting spell {spell_name}: {e}")
+            self.logger.error("Error casting spell %s: %s", spell_name, e)
             return {
                 'success': False,
-                'message': f'❌ Spell backfired: {str(e)}',
+                'message': _MSG_SPELL_BACKFIRED.format(label='Spell', error=e),
                 'spell': spell_name
             }
     
-    def _cast_expecto_long(self, symbol: str, amount: float, price: float, **kwargs) -> Dict:
+    @_spell('EXPECTO_LONG', 'Expecto Long')
+    def _cast_expecto_long(self, symbol: str, amount: float, price: float,
+                           timestamp: Optional[datetime] = None, **kwargs) -> Dict:
         """Cast Expecto Long spell to open a long position"""
-        try:
-            # Check risk management
-            risk_check = self.risk_manager.check_position_limit(symbol, 'LONG', amount, price)
-            if not risk_check['allowed']:
-                return {
-                    'success': False,
-                    'message': f'🛡️ Risk management blocked: {risk_check["reason"]}',
-                    'spell': 'EXPECTO_LONG'
-                }
-            
-            # Execute long position
-            trade_result = self.portfolio.open_long_position(symbol, amount, price)
+        if timestamp is None:
+            timestamp = datetime.now()
+        
+        # Check risk management
+        risk_check = self.risk_manager.check_position_limit(symbol, 'LONG', amount, price)
+        if risk_check['allowed']:
+            # No new positions once today's losses are past the daily floor
+            risk_check = self.risk_manager.check_daily_loss_limit(0.0)
+        if not risk_check['allowed']:
+            return {
+                'success': False,
+                'message': _MSG_RISK_BLOCKED.format(reason=risk_check['reason']),
+                'spell': 'EXPECTO_LONG'
+            }
+        
+        # Execute long position and log the trade, committed together (the
+        # in-memory portfolio is rolled back with the database if either fails)
+        with self.portfolio.atomic(symbol), self.db_manager.transaction():
+            trade_result = self.portfolio.open_long_position(symbol, amount, price, timestamp)
             
             if trade_result['success']:
-                # Log trade to database
                 self.db_manager.log_trade(
                     symbol=symbol,
                     action='LONG',
                     amount=amount,
                     price=price,
-                    timestamp=datetime.now(),
+                    timestamp=timestamp,
                     trade_id=trade_result['trade_id']
                 )
-                
-                return {
-                    'success': True,
-                    'message': f'🦌 Expecto Long cast successfully! Opened {amount} {symbol} at ${price:,.2f}',
-                    'trade_id': trade_result['trade_id'],
-                    'spell': 'EXPECTO_LONG'
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'❌ Expecto Long failed: {trade_result["message"]}',
-                    'spell': 'EXPECTO_LONG'
-                }
-                
-        except Exception as e:
+        
+        if trade_result['success']:
+            return {
+                'success': True,
+                'message': _MSG_OPEN_OK.format(label='Expecto Long', amount=amount, symbol=symbol, price=price),
+                'trade_id': trade_result['trade_id'],
+                'spell': 'EXPECTO_LONG'
+            }
+        else:
             return {
                 'success': False,
-                'message': f'❌ Expecto Long backfired: {str(e)}',
+                'message': _MSG_SPELL_FAILED.format(label='Expecto Long', reason=trade_result['message']),
                 'spell': 'EXPECTO_LONG'
             }
     
-    def _cast_expecto_short(self, symbol: str, amount: float, price: float, **kwargs) -> Dict:
+    @_spell('EXPECTO_SHORT', 'Expecto Short')
+    def _cast_expecto_short(self, symbol: str, amount: float, price: float,
+                            timestamp: Optional[datetime] = None, **kwargs) -> Dict:
         """Cast Expecto Short spell to open a short position"""
-        try:
-            # Check risk management
-            risk_check = self.risk_manager.check_position_limit(symbol, 'SHORT', amount, price)
-            if not risk_check['allowed']:
-                return {
-                    'success': False,
-                    'message': f'🛡️ Risk management blocked: {risk_check["reason"]}',
-                    'spell': 'EXPECTO_SHORT'
-                }
-            
-            # Execute short position
-            trade_result = self.portfolio.open_short_position(symbol, amount, price)
+        if timestamp is None:
+            timestamp = datetime.now()
+        
+        # Check risk management
+        risk_check = self.risk_manager.check_position_limit(symbol, 'SHORT', amount, price)
+        if risk_check['allowed']:
+            # No new positions once today's losses are past the daily floor
+            risk_check = self.risk_manager.check_daily_loss_limit(0.0)
+        if not risk_check['allowed']:
+            return {
+                'success': False,
+                'message': _MSG_RISK_BLOCKED.format(reason=risk_check['reason']),
+                'spell': 'EXPECTO_SHORT'
+            }
+        
+        # Execute short position and log the trade, committed together (the
+        # in-memory portfolio is rolled back with the database if either fails)
+        with self.portfolio.atomic(symbol), self.db_manager.transaction():
+            trade_result = self.portfolio.open_short_position(symbol, amount, price, timestamp)
             
             if trade_result['success']:
-                # Log trade to database
                 self.db_manager.log_trade(
                     symbol=symbol,
                     action='SHORT',
                     amount=amount,
                     price=price,
-                    timestamp=datetime.now(),
+                    timestamp=timestamp,
                     trade_id=trade_result['trade_id']
                 )
-                
-                return {
-                    'success': True,
-                    'message': f'🦌 Expecto Short cast successfully! Opened {amount} {symbol} at ${price:,.2f}',
-                    'trade_id': trade_result['trade_id'],
-                    'spell': 'EXPECTO_SHORT'
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'❌ Expecto Short failed: {trade_result["message"]}',
-                    'spell': 'EXPECTO_SHORT'
-                }
-                
-        except Exception as e:
+        
+        if trade_result['success']:
+            return {
+                'success': True,
+                'message': _MSG_OPEN_OK.format(label='Expecto Short', amount=amount, symbol=symbol, price=price),
+                'trade_id': trade_result['trade_id'],
+                'spell': 'EXPECTO_SHORT'
+            }
+        else:
             return {
                 'success': False,
-                'message': f'❌ Expecto Short backfired: {str(e)}',
+                'message': _MSG_SPELL_FAILED.format(label='Expecto Short', reason=trade_result['message']),
                 'spell': 'EXPECTO_SHORT'
             }
     
-    def _cast_finite_incantatem(self, symbol: str, amount: float, price: float, **kwargs) -> Dict:
+    @_spell('FINITE_INCANTATEM', 'Finite Incantatem')
+    def _cast_finite_incantatem(self, symbol: str, amount: float, price: float,
+                                timestamp: Optional[datetime] = None, **kwargs) -> Dict:
         """Cast Finite Incantatem to close positions"""
-        try:
-            position_type = kwargs.get('position_type', 'ALL')  # ALL, LONG, SHORT
-            
-            # Close positions
-            close_result = self.portfolio.close_positions(symbol, position_type, price)
+        if timestamp is None:
+            timestamp = datetime.now()
+        position_type = kwargs.get('position_type', 'ALL')  # ALL, LONG, SHORT
+        
+        # Close positions and log the closing trades, committed together (the
+        # in-memory portfolio is rolled back with the database if either fails)
+        with self.portfolio.atomic(symbol), self.db_manager.transaction():
+            close_result = self.portfolio.close_positions(symbol, position_type, price, timestamp)
             
             if close_result['success']:
-                # Log trade to database
-                for trade in close_result['closed_trades']:
-                    self.db_manager.log_trade(
-                        symbol=symbol,
-                        action=f'CLOSE_{trade["type"]}',
-                        amount=trade['amount'],
-                        price=price,
-                        timestamp=datetime.now(),
-                        trade_id=trade['trade_id']
-                    )
-                
-                return {
-                    'success': True,
-                    'message': f'🛡️ Finite Incantatem cast! Closed {close_result["total_amount"]} {symbol} positions',
-                    'closed_trades': close_result['closed_trades'],
-                    'spell': 'FINITE_INCANTATEM'
-                }
-            else:
-                return {
-                    'success': False,
-                    'message': f'❌ Finite Incantatem failed: {close_result["message"]}',
-                    'spell': 'FINITE_INCANTATEM'
-                }
-                
-        except Exception as e:
+                # Stream the rows straight into executemany
+                self.db_manager.log_trades_bulk(
+                    (trade['trade_id'], symbol, _CLOSE_ACTIONS[trade['type']], trade['amount'], price, timestamp)
+                    for trade in close_result['closed_trades']
+                )
+        
+        if close_result['success']:
+            self.risk_manager.update_daily_pnl(close_result['total_pnl'])
+            return {
+                'success': True,
+                'message': _MSG_CLOSE_OK.format(amount=close_result['total_amount'], symbol=symbol),
+                'closed_trades': close_result['closed_trades'],
+                'spell': 'FINITE_INCANTATEM'
+            }
+        else:
             return {
                 'success': False,
-                'message': f'❌ Finite Incantatem backfired: {str(e)}',
+                'message': _MSG_SPELL_FAILED.format(label='Finite Incantatem', reason=close_result['message']),
                 'spell': 'FINITE_INCANTATEM'
             }
     
+    def _roll_trading_day(self, timestamp: datetime) -> None:
+        """Reset daily loss tracking from the current portfolio value when a new day starts"""
+        day = timestamp.date()
+        if day == self._trading_day:
+            return
+        
+        current_prices = {}
+        for symbol in self.portfolio.positions:
+            price = self.market_data.get_price(symbol)
+            if price:
+                current_prices[symbol] = price
+        portfolio_value = self.portfolio.get_portfolio_value(current_prices)['total_value']
+        
+        self.risk_manager.reset_daily_tracking(portfolio_value)
+        self._trading_day = day
+    
     def _cast_alohomora(self, symbol: str, amount: float, price: float, **kwargs) -> Dict:
         """Cast Alohomora to unlock and open any position"""
-        position_type = kwargs.get('position_type', 'LONG')
-        if position_type == 'LONG':
-            return self._cast_expecto_long(symbol, amount, price, **kwargs)
-        else:
-            return self._cast_expecto_short(symbol, amount, price, **kwargs)
-    
-    def _cast_colloportus(self, symbol: str, amount: float, price: float, **kwargs) -> Dict:
-        """Cast Colloportus to lock and close positions"""
-        return self._cast_finite_incantatem(symbol, amount, price, **kwargs)
+        handler = self._aloho.get(kwargs.get('position_type', 'LONG'), self._cast_expecto_short)
+        return handler(symbol, amount, price, **kwargs)
     
     def _cast_lumos(self, symbol: str, amount: float, price: float, **kwargs) -> Dict:
         """Cast Lumos to light up the portfolio and activate trading"""
         self.start()
         return {
             'success': True,
-            'message': '✨ Lumos! Trading engine activated and portfolio illuminated!',
+            'message': _MSG_LUMOS,
             'spell': 'LUMOS'
         }
     
@@ -277,26 +395,39 @@ class TradingEngine:
         self.stop()
         return {
             'success': True,
-            'message': '🌙 Nox! Trading engine deactivated and portfolio darkened.',
+            'message': _MSG_NOX,
             'spell': 'NOX'
         }
     
     def get_session_stats(self) -> Dict:
         """Get current trading session statistics"""
-        duration = datetime.now() - self.session_stats['start_time']
+        with self._stats_lock:
+            stats = dict(self.session_stats)
         return {
-            **self.session_stats,
-            'duration': str(duration).split('.')[0],
-            'success_rate': (self.session_stats['successful_trades'] / max(1, self.session_stats['total_trades'])) * 100
+            **stats,
+            'duration': _format_duration(time.monotonic() - self._start_monotonic),
+            'success_rate': (stats['successful_trades'] / max(1, stats['total_trades'])) * 100
         }
     
-    def get_available_spells(self) -> List[str]:
-        """Get list of available trading spells"""
-        return list(self.spells.keys())
+    def get_available_spells(self) -> Tuple[str, ...]:
+        """Get the available trading spells"""
+        return self._spell_names
+    
+    def _check_recall_connector(self, recall_connector: Any) -> None:
+        """Warn when a Recall connector would open a fresh connection per call"""
+        session = getattr(recall_connector, '_http', None)
+        if not isinstance(session, requests.Session):
+            self.logger.warning("⚠️ Recall connector has no requests.Session; "
+                                "every trade submission will pay a new TCP/TLS handshake")
+        elif not isinstance(session.adapters.get('https://'), HTTPAdapter):
+            self.logger.warning("⚠️ Recall connector session has no HTTPAdapter mounted for https://; "
+                                "connections may not be pooled")
     
-    def set_recall_connector(self, recall_connector):
-        """Set the Recall API connector"""
+    def set_recall_connector(self, recall_connector: Any) -> None:
+        """Set the Recall API connector (expected to reuse connections through a requests.Session)"""
+        self._check_recall_connector(recall_connector)
         self.recall_connector = recall_connector
+        self._synced_version = None
         self.logger.info("🔗 Recall API connector set")
     
     def submit_trade_to_recall(self, trade_data: Dict) -> Dict:
@@ -308,37 +439,41 @@ class TradingEngine:
             }
         
         try:
-            # Get current portfolio data for context
-            portfolio_stats = self.portfolio.get_portfolio_stats()
-            
             # Prepare order data for Recall API
-            order_data = {
-                'symbol': trade_data.get('symbol'),
-                'amount': trade_data.get('amount'),
-                'type': 'MARKET',
-                'side': 'BUY' if trade_data.get('spell') == 'EXPECTO_LONG' else 'SELL',
-                'spell': trade_data.get('spell'),
-                'portfolio_value': portfolio_stats.get('cash', 0),
-                'risk_score': 0.0  # Could be calculated based on position size
-            }
+            order_data = self._build_recall_order(trade_data)
             
             # Submit to Recall API
             result = self.recall_connector.submit_order_to_competition(order_data)
             
             if result['success']:
-                self.logger.info(f"✅ Trade submitted to Recall competition: {result.get('order_id')}")
+                self.logger.info("✅ Trade submitted to Recall competition: %s", result.get('order_id'))
             else:
-                self.logger.warning(f"⚠️ Failed to submit trade to Recall: {result.get('message')}")
+                self.logger.warning("⚠️ Failed to submit trade to Recall: %s", result.get('message'))
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Error submitting trade to Recall: {e}")
+            self.logger.error("Error submitting trade to Recall: %s", e)
             return {
                 'success': False,
                 'message': f'Error submitting to Recall: {str(e)}'
             }
     
+    def _submit_io(self, func: Callable[..., Dict], *args: Any) -> Future:
+        """Run a blocking Recall call on the engine's I/O threads"""
+        with self.lock:
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='recall-io')
+            return self._io_pool.submit(func, *args)
+    
+    def submit_trade_to_recall_async(self, trade_data: Dict) -> Future:
+        """Submit a trade to Recall in the background; the Future resolves to the submit result"""
+        return self._submit_io(self.submit_trade_to_recall, trade_data)
+    
+    def sync_portfolio_with_recall_async(self) -> Future:
+        """Synchronize the portfolio with Recall in the background; the Future resolves to the sync result"""
+        return self._submit_io(self.sync_portfolio_with_recall)
+    
     def sync_portfolio_with_recall(self) -> Dict:
         """Synchronize portfolio with Recall API"""
         if not self.recall_connector:
@@ -347,41 +482,104 @@ class TradingEngine:
                 'message': 'Recall API connector not configured'
             }
         
+        # Nothing traded since the last successful sync - skip the request
+        version = getattr(self.portfolio, 'version', None)
+        if version is not None and version == self._synced_version:
+            return {
+                'success': True,
+                'message': 'Portfolio unchanged since last sync',
+                'synced': False
+            }
+        
         try:
-            # Get current portfolio data
-            portfolio_stats = self.portfolio.get_portfolio_stats()
-            portfolio_value = self.portfolio.get_portfolio_value({})
-            
             # Prepare portfolio data for sync
-            portfolio_data = {
-                'total_value': portfolio_value.get('total_value', 0),
-                'cash': portfolio_value.get('cash', 0),
-                'total_pnl': portfolio_stats.get('total_pnl', 0),
-                'total_pnl_percent': portfolio_stats.get('total_pnl_percent', 0),
-                'positions': self.portfolio.get_positions(),
-                'trades_count': portfolio_stats.get('total_trades', 0),
-                'win_rate': (portfolio_stats.get('winning_trades', 0) / max(1, portfolio_stats.get('total_trades', 1))) * 100,
-                'session_duration': str(datetime.now() - self.session_stats['start_time']).split('.')[0],
-                'risk_level': 'medium'  # Could be calculated based on risk metrics
-            }
+            portfolio_data = self._build_recall_portfolio()
             
             # Sync with Recall API
             result = self.recall_connector.sync_portfolio_with_api(portfolio_data)
             
             if result['success']:
+                self._synced_version = version
                 self.logger.info("🔄 Portfolio synchronized with Recall API")
             else:
-                self.logger.warning(f"⚠️ Portfolio sync failed: {result.get('message')}")
+                self.logger.warning("⚠️ Portfolio sync failed: %s", result.get('message'))
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Error syncing portfolio with Recall: {e}")
+            self.logger.error("Error syncing portfolio with Recall: %s", e)
             return {
                 'success': False,
                 'message': f'Error syncing with Recall: {str(e)}'
             }
     
+    def sync_with_recall_batch(self, trade_data: Dict) -> Dict:
+        """Submit a trade, sync the portfolio and refresh competition status in one request"""
+        if not self.recall_connector:
+            return {
+                'success': False,
+                'message': 'Recall API connector not configured'
+            }
+        
+        try:
+            result = self.recall_connector.batch([
+                {'op': 'order', 'payload': self._build_recall_order(trade_data)},
+                {'op': 'portfolio_sync', 'payload': self._build_recall_portfolio()},
+                {'op': 'status'}
+            ])
+            
+            if result['success']:
+                self.logger.info("📦 Trade, portfolio and status synced with Recall API")
+            else:
+                self.logger.warning("⚠️ Recall batch sync failed: %s", result.get('message'))
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error("Error running Recall batch sync: %s", e)
+            return {
+                'success': False,
+                'message': f'Error running batch sync with Recall: {str(e)}'
+            }
+    
+    def _build_recall_order(self, trade_data: Dict) -> Dict:
+        """Build Recall API order data for a trade"""
+        # Get current portfolio data for context
+        portfolio_stats = self.portfolio.get_portfolio_stats()
+        
+        return {
+            'symbol': trade_data.get('symbol'),
+            'amount': trade_data.get('amount'),
+            'type': 'MARKET',
+            'side': 'BUY' if trade_data.get('spell') == 'EXPECTO_LONG' else 'SELL',
+            'spell': trade_data.get('spell'),
+            'portfolio_value': portfolio_stats.get('cash', 0),
+            'risk_score': 0.0  # Could be calculated based on position size
+        }
+    
+    def _build_recall_portfolio(self) -> Dict:
+        """Build Recall API portfolio data from the current portfolio"""
+        portfolio_stats = self.portfolio.get_portfolio_stats()
+        portfolio_value = self.portfolio.get_portfolio_value({})
+        total_pnl = float(portfolio_stats.get('total_pnl', 0))
+        trades_count = portfolio_stats.get('total_trades', 0)
+        win_rate, pnl_percent = _portfolio_metrics(
+            portfolio_stats.get('winning_trades', 0), trades_count,
+            total_pnl, float(portfolio_stats.get('initial_cash', 0))
+        )
+        
+        return {
+            'total_value': portfolio_value.get('total_value', 0),
+            'cash': portfolio_value.get('cash', 0),
+            'total_pnl': total_pnl,
+            'total_pnl_percent': pnl_percent,
+            'positions': self.portfolio.get_positions(),
+            'trades_count': trades_count,
+            'win_rate': win_rate,
+            'session_duration': _format_duration(time.monotonic() - self._start_monotonic),
+            'risk_level': 'medium'  # Could be calculated based on risk metrics
+        }
+    
     def get_recall_competition_status(self) -> Dict:
         """Get Recall competition status"""
         if not self.recall_connector:
@@ -396,12 +594,12 @@ class TradingEngine:
             if result['success']:
                 self.logger.info("📊 Recall competition status retrieved")
             else:
-                self.logger.warning(f"⚠️ Failed to get competition status: {result.get('message')}")
+                self.logger.warning("⚠️ Failed to get competition status: %s", result.get('message'))
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Error getting Recall competition status: {e}")
+            self.logger.error("Error getting Recall competition status: %s", e)
             return {
                 'success': False,
                 'message': f'Error getting competition status: {str(e)}'
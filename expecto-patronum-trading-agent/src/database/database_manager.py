@@ -4,10 +4,125 @@ Database Manager - Magical storage for trading history
 
 import sqlite3
 import os
-from datetime import datetime
-from typing import Dict, List, Optional
+from array import array
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 
+# Connection settings applied right after connecting: WAL lets readers run
+# alongside the writer and, with synchronous=NORMAL, commits only fsync at
+# checkpoints instead of on every write; the WAL file is checkpointed every
+# 1000 pages and truncated back to at most 64 MiB afterwards
+_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+    PRAGMA busy_timeout=5000;
+    PRAGMA journal_size_limit=67108864;
+    PRAGMA wal_autocheckpoint=1000;
+'''
+
+# Price points and portfolio snapshots are buffered and written in one
+# transaction once this many are pending, or once the oldest is this many
+# seconds old - checked on each save and by flush_stale_buffers, which the
+# app calls on a timer
+_BUFFER_SIZE = 200
+_BUFFER_MAX_AGE = 5.0
+
+# Every table, in the order reset_portfolio clears them
+_TABLES = ('positions', 'trades', 'portfolio_snapshots', 'price_history')
+
+# Indexes backing the WHERE/ORDER BY clauses of the get_* queries
+_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_positions_status_entry ON positions (status, entry_time DESC);
+    CREATE INDEX IF NOT EXISTS idx_positions_symbol_entry ON positions (symbol, entry_time DESC);
+    CREATE INDEX IF NOT EXISTS idx_trades_symbol_ts ON trades (symbol, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_price_symbol_ts ON price_history (symbol, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON portfolio_snapshots (timestamp);
+'''
+
+# Statements run on every write or GUI refresh, kept as constants so each
+# call reuses the prepared statement from the connection's statement cache
+_INSERT_POSITION_SQL = '''
+    INSERT INTO positions (trade_id, symbol, type, amount, entry_price, entry_time, status)
+    VALUES (?, ?, ?, ?, ?, ?, 'OPEN')
+'''
+_CLOSE_POSITION_SQL = '''
+    UPDATE positions 
+    SET exit_price = ?, exit_time = ?, pnl = ?, status = 'CLOSED'
+    WHERE trade_id = ?
+'''
+_INSERT_TRADE_SQL = '''
+    INSERT INTO trades (trade_id, symbol, action, amount, price, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_INSERT_SNAPSHOT_SQL = '''
+    INSERT INTO portfolio_snapshots (timestamp, total_value, cash, total_pnl, total_pnl_percent)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_INSERT_PRICE_SQL = '''
+    INSERT INTO price_history (symbol, price, timestamp)
+    VALUES (?, ?, ?)
+'''
+_OPEN_POSITIONS_SQL = '''
+    SELECT * FROM positions WHERE status = 'OPEN'
+    ORDER BY entry_time DESC
+'''
+_POSITION_HISTORY_SQL = '''
+    SELECT * FROM positions 
+    ORDER BY entry_time DESC 
+    LIMIT ?
+'''
+_SYMBOL_POSITION_HISTORY_SQL = '''
+    SELECT * FROM positions 
+    WHERE symbol = ? 
+    ORDER BY entry_time DESC 
+    LIMIT ?
+'''
+_TRADE_HISTORY_SQL = '''
+    SELECT * FROM trades 
+    ORDER BY timestamp DESC 
+    LIMIT ?
+'''
+_SYMBOL_TRADE_HISTORY_SQL = '''
+    SELECT * FROM trades 
+    WHERE symbol = ? 
+    ORDER BY timestamp DESC 
+    LIMIT ?
+'''
+# The cutoff is bound as a datetime (stored the same way as the timestamp
+# column), so the comparison can use the timestamp indexes
+_PORTFOLIO_HISTORY_SQL = '''
+    SELECT * FROM portfolio_snapshots 
+    WHERE timestamp >= ?
+    ORDER BY timestamp ASC
+'''
+_PRICE_HISTORY_SQL = '''
+    SELECT * FROM price_history 
+    WHERE symbol = ? AND timestamp >= ?
+    ORDER BY timestamp ASC
+'''
+_PRICE_SERIES_SQL = '''
+    SELECT price, timestamp FROM price_history 
+    WHERE symbol = ? AND timestamp >= ?
+    ORDER BY timestamp ASC
+'''
+_TRADING_STATS_SQL = '''
+    SELECT
+        (SELECT COUNT(*) FROM trades) AS total_trades,
+        SUM(CASE WHEN status = 'CLOSED' AND pnl > 0 THEN 1 ELSE 0 END) AS wins,
+        SUM(CASE WHEN status = 'CLOSED' AND pnl < 0 THEN 1 ELSE 0 END) AS losses,
+        SUM(CASE WHEN status = 'CLOSED' THEN pnl END) AS total_pnl,
+        AVG(CASE WHEN status = 'CLOSED' THEN pnl END) AS avg_pnl
+    FROM positions
+'''
+
 class DatabaseManager:
     """Magical database manager for storing trading data"""
     
@@ -15,6 +130,18 @@ class DatabaseManager:
         self.db_path = db_path
         self.connection = None
         
+        # Serializes writers at the application level; re-entrant so a
+        # transaction() can wrap the save/log methods, which open their own
+        self._write_lock = threading.RLock()
+        self._tx_depth = 0
+        
+        # Pending rows for the buffered writers, with the monotonic time of
+        # the oldest pending row (None while empty)
+        self._price_buffer: List[tuple] = []
+        self._price_buffer_since = None
+        self._snapshot_buffer: List[tuple] = []
+        self._snapshot_buffer_since = None
+        
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
@@ -24,8 +151,10 @@ class DatabaseManager:
     def _init_database(self):
         """Initialize database tables"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            # Autocommit mode: transaction() issues BEGIN/COMMIT itself
+            self.connection = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=256)
             self.connection.row_factory = sqlite3.Row
+            self._apply_pragmas()
             
             # Create tables
             self._create_tables()
@@ -35,6 +164,18 @@ class DatabaseManager:
             self.logger.error(f"Error initializing database: {e}")
             raise
     
+    def _apply_pragmas(self):
+        """Tune the connection for many small writes (WAL, NORMAL sync, larger cache)"""
+        self.connection.executescript(_PRAGMAS)
+        
+        # journal_mode silently stays as-is where WAL is unsupported; in-memory
+        # databases never use WAL, so only file databases are worth a warning
+        if self.db_path == ':memory:':
+            return
+        journal_mode = self.connection.execute('PRAGMA journal_mode').fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            self.logger.warning(f"WAL journal mode not available, using {journal_mode}")
+    
     def _create_tables(self):
         """Create database tables if they don't exist"""
         cursor = self.connection.cursor()
@@ -92,18 +233,51 @@ class DatabaseManager:
         ''')
         
         self.connection.commit()
+        
+        # Indexes, plus planner statistics the first time they are created
+        self.connection.executescript(_INDEXES)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            self.connection.execute('ANALYZE')
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Group writes into one transaction, committed when the block exits
+        
+        Nested transactions join the outermost one, so only it commits (or
+        rolls back everything if an exception escapes).
+        
+        Yields:
+            The database connection
+        """
+        with self._write_lock:
+            if self._tx_depth:
+                self._tx_depth += 1
+                try:
+                    yield self.connection
+                finally:
+                    self._tx_depth -= 1
+                return
+            
+            self.connection.execute('BEGIN IMMEDIATE')
+            self._tx_depth = 1
+            try:
+                yield self.connection
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+            finally:
+                self._tx_depth = 0
     
     def save_position(self, trade_id: str, symbol: str, position_type: str, 
                      amount: float, entry_price: float, entry_time: datetime):
         """Save a new position to the database"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                INSERT INTO positions (trade_id, symbol, type, amount, entry_price, entry_time, status)
-                VALUES (?, ?, ?, ?, ?, ?, 'OPEN')
-            ''', (trade_id, symbol, position_type, amount, entry_price, entry_time))
+            with self.transaction() as conn:
+                conn.execute(_INSERT_POSITION_SQL, (trade_id, symbol, position_type, amount, entry_price, entry_time))
             
-            self.connection.commit()
             self.logger.info(f"Saved position: {trade_id}")
             
         except Exception as e:
@@ -113,51 +287,59 @@ class DatabaseManager:
     def close_position(self, trade_id: str, exit_price: float, exit_time: datetime, pnl: float):
         """Close a position in the database"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                UPDATE positions 
-                SET exit_price = ?, exit_time = ?, pnl = ?, status = 'CLOSED'
-                WHERE trade_id = ?
-            ''', (exit_price, exit_time, pnl, trade_id))
-            
-            self.connection.commit()
+            with self.transaction() as conn:
+                conn.execute(_CLOSE_POSITION_SQL, (exit_price, exit_time, pnl, trade_id))
+            
             self.logger.info(f"Closed position: {trade_id}")
             
         except Exception as e:
             self.logger.error(f"Error closing position: {e}")
             raise
     
+    def close_positions_bulk(self, rows: List[tuple]):
+        """Close several positions in one transaction; rows are (trade_id, exit_price, exit_time, pnl)"""
+        try:
+            with self.transaction() as conn:
+                conn.executemany(_CLOSE_POSITION_SQL, [(exit_price, exit_time, pnl, trade_id)
+                                                       for trade_id, exit_price, exit_time, pnl in rows])
+            
+            self.logger.info(f"Closed {len(rows)} positions")
+            
+        except Exception as e:
+            self.logger.error(f"Error closing positions: {e}")
+            raise
+    
     def log_trade(self, symbol: str, action: str, amount: float, price: float, 
                   timestamp: datetime, trade_id: str):
         """Log a trade action to the database"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                INSERT INTO trades (trade_id, symbol, action, amount, price, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (trade_id, symbol, action, amount, price, timestamp))
+            with self.transaction() as conn:
+                conn.execute(_INSERT_TRADE_SQL, (trade_id, symbol, action, amount, price, timestamp))
             
-            self.connection.commit()
             self.logger.info(f"Logged trade: {action} {amount} {symbol}")
             
         except Exception as e:
             self.logger.error(f"Error logging trade: {e}")
             raise
     
+    def log_trades_bulk(self, rows: Iterable[tuple]):
+        """Log several trades in one transaction; rows are (trade_id, symbol, action, amount, price, timestamp)"""
+        try:
+            with self.transaction() as conn:
+                cursor = conn.executemany(_INSERT_TRADE_SQL, rows)
+            
+            self.logger.info(f"Logged {cursor.rowcount} trades")
+            
+        except Exception as e:
+            self.logger.error(f"Error logging trades: {e}")
+            raise
+    
     def get_open_positions(self) -> List[Dict]:
         """Get all open positions"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                SELECT * FROM positions WHERE status = 'OPEN'
-                ORDER BY entry_time DESC
-            ''')
-            
-            positions = []
-            for row in cursor.fetchall():
-                positions.append(dict(row))
+            cursor = self.connection.execute(_OPEN_POSITIONS_SQL)
             
-            return positions
+            return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"Error getting open positions: {e}")
@@ -166,27 +348,12 @@ class DatabaseManager:
     def get_position_history(self, symbol: str = None, limit: int = 100) -> List[Dict]:
         """Get position history"""
         try:
-            cursor = self.connection.cursor()
-            
             if symbol:
-                cursor.execute('''
-                    SELECT * FROM positions 
-                    WHERE symbol = ? 
-                    ORDER BY entry_time DESC 
-                    LIMIT ?
-                ''', (symbol, limit))
+                cursor = self.connection.execute(_SYMBOL_POSITION_HISTORY_SQL, (symbol, limit))
             else:
-                cursor.execute('''
-                    SELECT * FROM positions 
-                    ORDER BY entry_time DESC 
-                    LIMIT ?
-                ''', (limit,))
-            
-            positions = []
-            for row in cursor.fetchall():
-                positions.append(dict(row))
+                cursor = self.connection.execute(_POSITION_HISTORY_SQL, (limit,))
             
-            return positions
+            return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"Error getting position history: {e}")
@@ -195,27 +362,12 @@ class DatabaseManager:
     def get_trade_history(self, symbol: str = None, limit: int = 100) -> List[Dict]:
         """Get trade history"""
         try:
-            cursor = self.connection.cursor()
-            
             if symbol:
-                cursor.execute('''
-                    SELECT * FROM trades 
-                    WHERE symbol = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                ''', (symbol, limit))
+                cursor = self.connection.execute(_SYMBOL_TRADE_HISTORY_SQL, (symbol, limit))
             else:
-                cursor.execute('''
-                    SELECT * FROM trades 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                ''', (limit,))
-            
-            trades = []
-            for row in cursor.fetchall():
-                trades.append(dict(row))
+                cursor = self.connection.execute(_TRADE_HISTORY_SQL, (limit,))
             
-            return trades
+            return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"Error getting trade history: {e}")
@@ -223,109 +375,117 @@ class DatabaseManager:
     
     def save_portfolio_snapshot(self, total_value: float, cash: float, 
                                total_pnl: float, total_pnl_percent: float):
-        """Save a portfolio snapshot"""
+        """Buffer a portfolio snapshot (written by flush_portfolio_snapshots)"""
+        now = time.monotonic()
+        if not self._snapshot_buffer:
+            self._snapshot_buffer_since = now
+        self._snapshot_buffer.append((datetime.now(), total_value, cash, total_pnl, total_pnl_percent))
+        
+        if len(self._snapshot_buffer) >= _BUFFER_SIZE or now - self._snapshot_buffer_since >= _BUFFER_MAX_AGE:
+            self.flush_portfolio_snapshots()
+    
+    def flush_portfolio_snapshots(self):
+        """Write all buffered portfolio snapshots in one transaction"""
+        rows, self._snapshot_buffer = self._snapshot_buffer, []
+        since, self._snapshot_buffer_since = self._snapshot_buffer_since, None
+        if not rows:
+            return
+        
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                INSERT INTO portfolio_snapshots (timestamp, total_value, cash, total_pnl, total_pnl_percent)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (datetime.now(), total_value, cash, total_pnl, total_pnl_percent))
-            
-            self.connection.commit()
+            with self.transaction() as conn:
+                conn.executemany(_INSERT_SNAPSHOT_SQL, rows)
             
         except Exception as e:
-            self.logger.error(f"Error saving portfolio snapshot: {e}")
+            # Keep the rows (ahead of any added meanwhile) for the next flush
+            self._snapshot_buffer[:0] = rows
+            self._snapshot_buffer_since = since
+            self.logger.error(f"Error saving {len(rows)} portfolio snapshots, will retry: {e}")
     
     def get_portfolio_history(self, hours: int = 24) -> List[Dict]:
         """Get portfolio history"""
+        self.flush_portfolio_snapshots()
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                SELECT * FROM portfolio_snapshots 
-                WHERE timestamp >= datetime('now', '-{} hours')
-                ORDER BY timestamp ASC
-            '''.format(hours))
-            
-            history = []
-            for row in cursor.fetchall():
-                history.append(dict(row))
+            cutoff = datetime.now() - timedelta(hours=hours)
+            cursor = self.connection.execute(_PORTFOLIO_HISTORY_SQL, (cutoff,))
             
-            return history
+            return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"Error getting portfolio history: {e}")
             return []
     
     def save_price_history(self, symbol: str, price: float, timestamp: datetime):
-        """Save price history point"""
+        """Buffer a price history point (written by flush_price_history)"""
+        now = time.monotonic()
+        if not self._price_buffer:
+            self._price_buffer_since = now
+        self._price_buffer.append((symbol, price, timestamp))
+        
+        if len(self._price_buffer) >= _BUFFER_SIZE or now - self._price_buffer_since >= _BUFFER_MAX_AGE:
+            self.flush_price_history()
+    
+    def flush_price_history(self):
+        """Write all buffered price history points in one transaction"""
+        rows, self._price_buffer = self._price_buffer, []
+        since, self._price_buffer_since = self._price_buffer_since, None
+        if not rows:
+            return
+        
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                INSERT INTO price_history (symbol, price, timestamp)
-                VALUES (?, ?, ?)
-            ''', (symbol, price, timestamp))
-            
-            self.connection.commit()
+            with self.transaction() as conn:
+                conn.executemany(_INSERT_PRICE_SQL, rows)
             
         except Exception as e:
-            self.logger.error(f"Error saving price history: {e}")
+            # Keep the rows (ahead of any added meanwhile) for the next flush
+            self._price_buffer[:0] = rows
+            self._price_buffer_since = since
+            self.logger.error(f"Error saving {len(rows)} price history points, will retry: {e}")
     
     def get_price_history(self, symbol: str, hours: int = 24) -> List[Dict]:
         """Get price history from database"""
+        self.flush_price_history()
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('''
-                SELECT * FROM price_history 
-                WHERE symbol = ? AND timestamp >= datetime('now', '-{} hours')
-                ORDER BY timestamp ASC
-            '''.format(hours), (symbol,))
-            
-            history = []
-            for row in cursor.fetchall():
-                history.append(dict(row))
+            cutoff = datetime.now() - timedelta(hours=hours)
+            cursor = self.connection.execute(_PRICE_HISTORY_SQL, (symbol, cutoff))
             
-            return history
+            return [dict(row) for row in cursor]
             
         except Exception as e:
             self.logger.error(f"Error getting price history: {e}")
             return []
     
+    def iter_price_history(self, symbol: str, hours: int = 24) -> Iterator[tuple]:
+        """Yield (price, timestamp) tuples straight from the cursor, oldest first"""
+        self.flush_price_history()
+        cutoff = datetime.now() - timedelta(hours=hours)
+        for row in self.connection.execute(_PRICE_SERIES_SQL, (symbol, cutoff)):
+            yield row[0], row[1]
+    
+    def get_price_series(self, symbol: str, hours: int = 24) -> Tuple[List[str], array]:
+        """Get (timestamps, prices) for charting; prices are an array('d'), timestamps as stored"""
+        timestamps = []
+        prices = array('d')
+        try:
+            for price, timestamp in self.iter_price_history(symbol, hours):
+                prices.append(price)
+                timestamps.append(timestamp)
+            
+        except Exception as e:
+            self.logger.error(f"Error getting price series: {e}")
+            return [], array('d')
+        
+        return timestamps, prices
+    
     def get_trading_stats(self) -> Dict:
         """Get trading statistics"""
         try:
-            cursor = self.connection.cursor()
-            
-            # Total trades
-            cursor.execute('SELECT COUNT(*) as total FROM trades')
-            total_trades = cursor.fetchone()['total']
-            
-            # Winning trades
-            cursor.execute('''
-                SELECT COUNT(*) as wins FROM positions 
-                WHERE status = 'CLOSED' AND pnl > 0
-            ''')
-            winning_trades = cursor.fetchone()['wins']
-            
-            # Losing trades
-            cursor.execute('''
-                SELECT COUNT(*) as losses FROM positions 
-                WHERE status = 'CLOSED' AND pnl < 0
-            ''')
-            losing_trades = cursor.fetchone()['losses']
-            
-            # Total P&L
-            cursor.execute('''
-                SELECT SUM(pnl) as total_pnl FROM positions 
-                WHERE status = 'CLOSED'
-            ''')
-            total_pnl = cursor.fetchone()['total_pnl'] or 0.0
-            
-            # Average P&L per trade
-            cursor.execute('''
-                SELECT AVG(pnl) as avg_pnl FROM positions 
-                WHERE status = 'CLOSED'
-            ''')
-            avg_pnl = cursor.fetchone()['avg_pnl'] or 0.0
+            # One pass over positions for all the closed-trade aggregates
+            row = self.connection.execute(_TRADING_STATS_SQL).fetchone()
+            total_trades = row['total_trades']
+            winning_trades = row['wins'] or 0
+            losing_trades = row['losses'] or 0
+            total_pnl = row['total_pnl'] or 0.0
+            avg_pnl = row['avg_pnl'] or 0.0
             
             return {
                 'total_trades': total_trades,
@@ -340,23 +500,51 @@ class DatabaseManager:
             self.logger.error(f"Error getting trading stats: {e}")
             return {}
     
+    def flush_stale_buffers(self):
+        """Flush buffers whose oldest row has waited _BUFFER_MAX_AGE seconds (call periodically)"""
+        now = time.monotonic()
+        if self._price_buffer_since is not None and now - self._price_buffer_since >= _BUFFER_MAX_AGE:
+            self.flush_price_history()
+        if self._snapshot_buffer_since is not None and now - self._snapshot_buffer_since >= _BUFFER_MAX_AGE:
+            self.flush_portfolio_snapshots()
+    
     def reset_portfolio(self):
         """Reset portfolio data (for testing)"""
+        self._price_buffer, self._price_buffer_since = [], None
+        self._snapshot_buffer, self._snapshot_buffer_since = [], None
         try:
-            cursor = self.connection.cursor()
-            cursor.execute('DELETE FROM positions')
-            cursor.execute('DELETE FROM trades')
-            cursor.execute('DELETE FROM portfolio_snapshots')
-            cursor.execute('DELETE FROM price_history')
+            with self.transaction() as conn:
+                for table in _TABLES:
+                    conn.execute(f'DELETE FROM {table}')
+            
+            # Give the freed pages back to the filesystem (VACUUM cannot run
+            # inside a transaction, so skip it when called from one)
+            with self._write_lock:
+                if not self._tx_depth:
+                    self.connection.execute('VACUUM')
             
-            self.connection.commit()
             self.logger.info("Portfolio data reset")
             
         except Exception as e:
             self.logger.error(f"Error resetting portfolio: {e}")
     
+    def checkpoint(self):
+        """Copy the WAL back into the database file and truncate it"""
+        try:
+            with self._write_lock:
+                busy, wal_pages, moved = self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+            
+            if busy:
+                self.logger.warning(f"WAL checkpoint incomplete ({moved}/{wal_pages} pages), readers still active")
+            
+        except Exception as e:
+            self.logger.error(f"Error checkpointing database: {e}")
+    
     def close(self):
-        """Close database connection"""
+        """Flush buffered writes, checkpoint and close database connection"""
         if self.connection:
+            self.flush_price_history()
+            self.flush_portfolio_snapshots()
+            self.checkpoint()
             self.connection.close()
             self.logger.info("Database connection closed")
\ No newline at end of file
@@ -26,6 +26,9 @@ class ChartsTab:
             'warning': '#fbbf24'
         }
         
+        # (symbol, timeframe) -> (rendered chart text, newest price timestamp it was built from)
+        self._chart_cache = {}
+        
         self.create_widgets()
     
     def create_widgets(self):
@@ -180,20 +183,13 @@ class ChartsTab:
         
         # Create simple ASCII chart
         height = 15
-        for i in range(height):
-            line = ""
-            for j, price in enumerate(prices):
-                # Normalize price to chart height
-                normalized = (price - min_price) / price_range
-                chart_pos = int(normalized * (height - 1))
-                
-                if chart_pos == (height - 1 - i):
-                    line += "█"  # Full block for price point
-                elif chart_pos > (height - 1 - i):
-                    line += "│"  # Vertical line for area below
-                else:
-                    line += " "  # Empty space
-            chart_lines.append(line)
+        
+        # Normalize each price to a chart row once, rather than once per row
+        heights = [int((price - min_price) / price_range * (height - 1)) for price in prices]
+        
+        for level in range(height - 1, -1, -1):
+            # Full block for the price point, vertical line for the area below
+            chart_lines.append("".join(["█" if h == level else "│" if h > level else " " for h in heights]))
         
         chart_lines.append("=" * 60)
         
@@ -231,31 +227,32 @@ class ChartsTab:
             # Clear previous chart
             self.chart_text.delete(1.0, tk.END)
             
+            # Reuse the rendered chart until a new price point arrives
+            latest = self.market_data.get_latest_timestamp(symbol)
+            cached = self._chart_cache.get((symbol, timeframe))
+            if cached is not None and latest is not None and cached[1] == latest:
+                self.chart_text.insert(tk.END, cached[0])
+                return
+            
             # Get price history
             hours = self.get_hours_from_timeframe(timeframe)
-            price_history = self.market_data.get_price_history(symbol, hours)
+            timestamps, prices = self.market_data.get_price_series(symbol, hours)
             
-            if not price_history:
+            if not prices:
                 # Show placeholder
                 self.chart_text.insert(tk.END, f"No data available for {symbol.upper()}\n")
                 self.chart_text.insert(tk.END, "Please wait for market data to load...\n")
                 return
             
-            # Extract data
-            timestamps = [point['timestamp'] for point in price_history]
-            prices = [point['price'] for point in price_history]
-            
-            # Create chart
-            chart_content = self.create_text_chart(prices, timestamps)
-            
-            # Add header
-            header = f"{symbol.upper()} Price Chart ({timeframe})\n"
-            header += f"Current Price: ${prices[-1]:,.2f}\n"
-            header += f"Data Points: {len(prices)}\n"
-            header += "-" * 60 + "\n\n"
-            
-            self.chart_text.insert(tk.END, header)
-            self.chart_text.insert(tk.END, chart_content)
+            # Header, chart and statistics are assembled into one string and inserted once
+            parts = [
+                f"{symbol.upper()} Price Chart ({timeframe})",
+                f"Current Price: ${prices[-1]:,.2f}",
+                f"Data Points: {len(prices)}",
+                "-" * 60,
+                "",
+                self.create_text_chart(prices, timestamps)
+            ]
             
             # Add statistics
             if len(prices) > 1:
@@ -265,14 +262,20 @@ class ChartsTab:
                 price_change = current_price - prices[0]
                 price_change_pct = (price_change / prices[0]) * 100
                 
-                stats = f"\n\n📊 Price Statistics:\n"
-                stats += f"Current: ${current_price:,.2f}\n"
-                stats += f"High:    ${max_price:,.2f}\n"
-                stats += f"Low:     ${min_price:,.2f}\n"
-                stats += f"Change:  ${price_change:+,.2f} ({price_change_pct:+.2f}%)\n"
-                stats += f"Range:   ${max_price - min_price:,.2f}\n"
-                
-                self.chart_text.insert(tk.END, stats)
+                parts += [
+                    "",
+                    "📊 Price Statistics:",
+                    f"Current: ${current_price:,.2f}",
+                    f"High:    ${max_price:,.2f}",
+                    f"Low:     ${min_price:,.2f}",
+                    f"Change:  ${price_change:+,.2f} ({price_change_pct:+.2f}%)",
+                    f"Range:   ${max_price - min_price:,.2f}",
+                    ""
+                ]
+            
+            chart_content = "\n".join(parts)
+            self._chart_cache[(symbol, timeframe)] = (chart_content, latest)
+            self.chart_text.insert(tk.END, chart_content)
             
         except Exception as e:
             print(f"Error updating chart: {e}")
@@ -186,11 +186,11 @@ class MainWindow:
             self.portfolio_tab.update_display()
             self.charts_tab.update_display()
             
-            # Schedule next update
-            self.root.after(5000, self.update_displays)
-            
         except Exception as e:
             print(f"Error updating displays: {e}")
+        finally:
+            # Schedule next update, even if this one failed
+            self.root.after(5000, self.update_displays)
     
     def update_status_indicators(self):
         """Update status indicators"""
@@ -6,9 +6,6 @@ Test script for Expecto Patronum Trading Agent
 import sys
 import os
 
-# Add the src directory to the path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-
 def test_imports():
     """Test that all modules can be imported"""
     print("🧪 Testing imports...")
@@ -109,6 +106,47 @@ def test_risk_manager():
     
     return True
 
+def test_risk_batch_matches_single():
+    """Test that batch position checks agree with single checks"""
+    print("\n⚖️ Testing batch risk checks...")
+    
+    try:
+        from src.core.risk_manager import RiskManager
+        
+        risk_manager = RiskManager()
+        orders = [
+            ("bitcoin", "LONG", 0.1, 50000.0),
+            ("BITCOIN", "LONG", 0.5, 50000.0),      # Over the value limit
+            ("bitcoin", "LONG", 2.0, 100.0),        # Over the amount limit
+            ("bitcoin", "SHORT", 0.1, 50000.0),     # Over the leverage limit
+            ("ethereum", "SHORT", 20.0, 3000.0),    # Amount limit comes first
+            ("unknowncoin", "LONG", 5.0, 10.0),     # Default limits
+            ("unknowncoin", "SHORT", 5.0, 10.0),
+            ("bitcoin", "LONG", 0.0, 50000.0),      # Bad amount
+            ("bitcoin", "SHORT", -1.0, 50000.0),
+            ("bitcoin", "LONG", 0.1, 0.0),          # Bad price
+            ("bitcoin", "LONG", float("nan"), 50000.0),
+            ("bitcoin", "SHORT", 0.1, float("nan")),
+        ]
+        
+        symbols, position_types, amounts, prices = zip(*orders)
+        allowed, codes = risk_manager.check_positions_batch(symbols, position_types, amounts, prices)
+        
+        for index, order in enumerate(orders):
+            single = risk_manager.check_position_limit(*order)
+            if (allowed[index], codes[index]) != (single['allowed'], single['code']):
+                print(f"❌ Batch and single checks disagree for {order}: "
+                      f"({allowed[index]}, {codes[index]}) vs ({single['allowed']}, {single['code']})")
+                return False
+        
+        print("✅ Batch risk checks match single checks")
+        
+    except Exception as e:
+        print(f"❌ Batch risk check test failed: {e}")
+        return False
+    
+    return True
+
 def test_portfolio():
     """Test portfolio management"""
     print("\n📜 Testing portfolio...")
@@ -137,6 +175,208 @@ def test_portfolio():
     
     return True
 
+def test_buffered_writes():
+    """Test that buffered price and snapshot rows reach readers and survive a failed flush"""
+    print("\n📦 Testing buffered writes...")
+    
+    try:
+        import sqlite3
+        from datetime import datetime
+        from src.database.database_manager import DatabaseManager
+        
+        db = DatabaseManager(":memory:")
+        
+        def stored_prices():
+            return db.connection.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+        
+        # Readers flush pending rows before querying
+        for price in (50000.0, 50100.0, 50200.0):
+            db.save_price_history("bitcoin", price, datetime.now())
+        db.save_portfolio_snapshot(10000.0, 10000.0, 0.0, 0.0)
+        if stored_prices() != 0:
+            print("❌ Price points were written before a flush")
+            return False
+        if len(db.get_price_history("bitcoin")) != 3 or len(db.get_portfolio_history()) != 1:
+            print("❌ Readers did not see buffered rows")
+            return False
+        
+        # A failed flush keeps its rows for the next one
+        def failing_transaction():
+            raise sqlite3.OperationalError("database is locked")
+        
+        db.save_price_history("bitcoin", 50300.0, datetime.now())
+        db.transaction = failing_transaction
+        db.flush_price_history()
+        del db.transaction
+        if len(db._price_buffer) != 1 or stored_prices() != 3:
+            print("❌ Failed flush dropped its rows")
+            return False
+        db.flush_price_history()
+        if stored_prices() != 4 or db._price_buffer:
+            print("❌ Retried flush did not write the kept rows")
+            return False
+        
+        print("✅ Buffered rows are flushed for readers and kept on failure")
+        db.close()
+        
+    except Exception as e:
+        print(f"❌ Buffered writes test failed: {e}")
+        return False
+    
+    return True
+
+def test_close_positions_db_failure():
+    """Test that a failed close leaves the portfolio untouched"""
+    print("\n🔒 Testing close rollback...")
+    
+    try:
+        from src.core.portfolio import Portfolio
+        from src.database.database_manager import DatabaseManager
+        
+        db = DatabaseManager(":memory:")
+        portfolio = Portfolio(db)
+        portfolio.open_long_position("bitcoin", 0.1, 50000.0)
+        
+        cash = portfolio.cash
+        open_count = portfolio._open_position_count
+        position = portfolio.positions["bitcoin"][0]
+        
+        def failing_bulk(rows):
+            raise RuntimeError("disk full")
+        
+        db.close_positions_bulk = failing_bulk
+        result = portfolio.close_positions("bitcoin", current_price=55000.0)
+        
+        if (result['success'] or portfolio.cash != cash
+                or portfolio._open_position_count != open_count
+                or position['status'] != 'OPEN'
+                or position not in portfolio.open_positions["bitcoin"]["LONG"]):
+            print("❌ Failed close changed the portfolio")
+            return False
+        
+        print("✅ Failed close left the portfolio unchanged")
+        db.close()
+        
+    except Exception as e:
+        print(f"❌ Close rollback test failed: {e}")
+        return False
+    
+    return True
+
+def test_nested_transaction_rollback():
+    """Test that an error in a nested transaction rolls back the outer one"""
+    print("\n🔁 Testing nested transaction rollback...")
+    
+    try:
+        from datetime import datetime
+        from src.database.database_manager import DatabaseManager
+        
+        db = DatabaseManager(":memory:")
+        
+        try:
+            with db.transaction():
+                db.save_position("outer-1", "bitcoin", "LONG", 0.1, 50000.0, datetime.now())
+                with db.transaction():
+                    db.log_trade("bitcoin", "LONG", 0.1, 50000.0, datetime.now(), "outer-1")
+                    raise RuntimeError("spell backfired")
+        except RuntimeError:
+            pass
+        
+        positions = db.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+        trades = db.connection.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+        if positions or trades or db._tx_depth:
+            print("❌ Nested transaction left rows behind")
+            return False
+        
+        # The connection is usable again afterwards
+        db.save_position("after-1", "bitcoin", "LONG", 0.1, 50000.0, datetime.now())
+        if len(db.get_open_positions()) != 1:
+            print("❌ Writes failed after a rolled back transaction")
+            return False
+        
+        print("✅ Nested transaction rolled back as a whole")
+        db.close()
+        
+    except Exception as e:
+        print(f"❌ Nested transaction test failed: {e}")
+        return False
+    
+    return True
+
+def test_daily_loss_limit():
+    """Test the daily loss floor over a flat, a winning and a losing day"""
+    print("\n📅 Testing daily loss limit...")
+    
+    try:
+        from datetime import datetime
+        from src.core.trading_engine import TradingEngine
+        from src.core.portfolio import Portfolio
+        from src.core.risk_manager import RiskManager
+        from src.database.database_manager import DatabaseManager
+        
+        class FixedPrices:
+            """Market data stand-in whose price the test sets"""
+            def __init__(self):
+                self.prices = {}
+            
+            def get_price(self, symbol):
+                return self.prices.get(symbol)
+        
+        db = DatabaseManager(":memory:")
+        market = FixedPrices()
+        portfolio = Portfolio(db)
+        risk_manager = RiskManager()
+        engine = TradingEngine(market, portfolio, risk_manager, db)
+        engine.start()
+        
+        def trade_day(day, entry, exit):
+            """Open 0.1 BTC at entry and close it at exit; return the next open's result"""
+            timestamp = datetime(2024, 1, day, 12)
+            market.prices['bitcoin'] = entry
+            opened = engine.cast_spell('EXPECTO_LONG', 'bitcoin', 0.1, timestamp=timestamp)
+            market.prices['bitcoin'] = exit
+            closed = engine.cast_spell('FINITE_INCANTATEM', 'bitcoin', 0, timestamp=timestamp)
+            if not (opened['success'] and closed['success']):
+                raise AssertionError(f"Trade failed: {opened['message']} / {closed['message']}")
+            result = engine.cast_spell('EXPECTO_LONG', 'bitcoin', 0.01, timestamp=timestamp)
+            engine.cast_spell('FINITE_INCANTATEM', 'bitcoin', 0, timestamp=timestamp)
+            return result
+        
+        # Flat day: nothing lost, trading continues
+        if not trade_day(1, 50000.0, 50000.0)['success'] or risk_manager.daily_pnl != 0.0:
+            print("❌ Flat day blocked trading")
+            return False
+        
+        # Winning day: the new day's floor comes from the opening portfolio value
+        opening_value = portfolio.cash
+        if not trade_day(2, 50000.0, 51000.0)['success'] or risk_manager.daily_pnl != 100.0:
+            print("❌ Winning day blocked trading")
+            return False
+        if risk_manager._daily_loss_floor != -opening_value * risk_manager.max_daily_loss:
+            print("❌ Daily floor not reset from the portfolio value")
+            return False
+        
+        # Losing day: -1500 crosses the -1010 floor, so new positions are blocked
+        blocked = trade_day(3, 50000.0, 35000.0)
+        if blocked['success'] or 'daily loss' not in blocked['message'].lower():
+            print(f"❌ Losing day did not block trading: {blocked['message']}")
+            return False
+        
+        # The next day starts fresh
+        market.prices['bitcoin'] = 35000.0
+        if not engine.cast_spell('EXPECTO_LONG', 'bitcoin', 0.01, timestamp=datetime(2024, 1, 4, 12))['success']:
+            print("❌ Trading still blocked on the next day")
+            return False
+        
+        print("✅ Daily loss limit resets each day and blocks past the floor")
+        db.close()
+        
+    except Exception as e:
+        print(f"❌ Daily loss limit test failed: {e}")
+        return False
+    
+    return True
+
 def main():
     """Run all tests"""
     print("🦌 Expecto Patronum Trading Agent - Test Suite")
@@ -145,9 +385,14 @@ def main():
     tests = [
         test_imports,
         test_database,
+        test_buffered_writes,
         test_market_data,
         test_risk_manager,
-        test_portfolio
+        test_risk_batch_matches_single,
+        test_portfolio,
+        test_close_positions_db_failure,
+        test_nested_transaction_rollback,
+        test_daily_loss_limit
     ]
     
     passed = 0